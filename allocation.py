@@ -0,0 +1,96 @@
+import numpy as np
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+U64_LIMIT = 1 << 64
+# Limits of the float64 estimate in _divmod_estimated: its error stays within a few units,
+# so the exact correction step works while a few multiples of the total fit in i64
+ESTIMATE_REMAINDER_LIMIT = 1 << 53
+ESTIMATE_TOTAL_LIMIT = 1 << 59
+
+def sol_to_lamports(sol: float) -> int:
+    """Convert a SOL amount to whole lamports without float truncation error"""
+    return int(round(sol * LAMPORTS_PER_SOL))
+
+def _divmod_estimated(weights: np.ndarray, amount: int, total: int):
+    """floor(weights * amount / total) and its remainder in u64, without 128-bit products.
+
+    With amount = q * total + r, each share is weights * q (exact, it is at most amount)
+    plus weights * r / total. That part is estimated in float64 and corrected exactly:
+    weights * r - estimate * total is computed in wrapping u64, and read as i64 it is the
+    true remainder, stepped into [0, total) a unit at a time.
+    """
+    q, r = divmod(amount, total)
+    estimate = np.floor(weights.astype(np.float64) * float(r) / float(total))
+    estimate = np.clip(estimate, 0, r).astype(np.uint64)
+    remainders = (weights * np.uint64(r) - estimate * np.uint64(total)).view(np.int64)
+
+    step = np.int64(total)
+    while True:
+        low, high = remainders < 0, remainders >= step
+        if not (low.any() or high.any()):
+            break
+        estimate = estimate - low + high
+        remainders = remainders + step * low - step * high
+
+    return weights * np.uint64(q) + estimate, remainders.view(np.uint64)
+
+def _largest_remainder(weights: np.ndarray, amount: int) -> np.ndarray:
+    """Split `amount` pro rata to `weights` with exact largest-remainder rounding"""
+    n = len(weights)
+    # u64 sum is exact unless n * max could wrap
+    total = int(weights.sum()) if int(weights.max(initial=0)) * n < U64_LIMIT else int(weights.sum(dtype=object))
+
+    if total == 0 or amount == 0:
+        return np.zeros(n, dtype=np.int64)
+    if total >= U64_LIMIT:
+        raise ValueError(f"Total weight {total} does not fit in u64")
+
+    # weight * amount overflows u64 for large burns (the usual case), so it is split up
+    # (_divmod_estimated); exact Python ints are only the last resort
+    if int(weights.max()) * amount < U64_LIMIT:
+        products = weights * np.uint64(amount)
+        floors = products // np.uint64(total)
+        remainders = products % np.uint64(total)
+    elif amount % total < ESTIMATE_REMAINDER_LIMIT and total < ESTIMATE_TOTAL_LIMIT:
+        floors, remainders = _divmod_estimated(weights, amount, total)
+    else:
+        products = weights.astype(object) * amount
+        floors = products // total
+        remainders = (products % total).astype(np.uint64)
+
+    allocations = floors.astype(np.int64)
+    leftover = amount - int(allocations.sum())
+
+    # Hand the leftover lamports (always < n) to the largest remainders, lowest index first on ties
+    # (partitioned around the leftover-th largest, not fully sorted)
+    if leftover > 0:
+        key = ~remainders  # Ascending key, largest remainder first
+        threshold = np.partition(key, leftover - 1)[leftover - 1]
+        above = np.flatnonzero(key < threshold)
+        ties = np.flatnonzero(key == threshold)[:leftover - len(above)]
+        allocations[above] += 1
+        allocations[ties] += 1
+
+    return allocations
+
+def allocate_lamports(burned, distributable_lamports: int, min_lamports: int = 0) -> np.ndarray:
+    """Allocate lamports to holders in proportion to their burned amounts.
+
+    Holders whose allocation would fall below `min_lamports` are excluded and their
+    share is redistributed among the rest. The returned int64 array sums exactly to
+    `distributable_lamports`, or is all zeros when no holder qualifies.
+    """
+    burned = np.asarray(burned, dtype=np.uint64)
+    eligible = burned > 0
+
+    while eligible.any():
+        allocations = _largest_remainder(np.where(eligible, burned, np.uint64(0)), distributable_lamports)
+        below_min = eligible & (allocations < min_lamports)
+
+        if not below_min.any():
+            return allocations
+
+        eligible &= ~below_min
+
+    return np.zeros(len(burned), dtype=np.int64)
@@ -0,0 +1,187 @@
+import base64
+import asyncio
+import base58
+import numpy as np
+from solders.pubkey import Pubkey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import DataSliceOpts, MemcmpOpts
+from typing import Iterable, Iterator, List, Tuple
+
+ATOMID_PROGRAM_ID = Pubkey.from_string("rnc2fycemiEgj4YbMSuwKFpdV6nkJonojCXib3j2by6")
+
+# AtomID account layout:
+# - 8 bytes: discriminator
+# - 32 bytes: owner (Pubkey)
+# - 8 bytes: total_burned (u64)
+# - 1 byte: rank (u8)
+# - 204 bytes: metadata (String with length prefix)
+# - 8 bytes: created_at_slot (u64)
+# - 8 bytes: updated_at_slot (u64)
+# - 1 byte: bump
+ACCOUNT_DTYPE = np.dtype([
+    ('discriminator', 'V8'),
+    ('owner', 'u1', (32,)),
+    ('total_burned', '<u8'),
+    ('rank', 'u1'),
+    ('metadata', 'V204'),
+    ('created_at_slot', '<u8'),
+    ('updated_at_slot', '<u8'),
+    ('bump', 'u1'),
+])
+ATOMID_ACCOUNT_SIZE = ACCOUNT_DTYPE.itemsize  # 270
+
+# Payouts only need owner, total_burned and rank: 41 bytes starting after the discriminator
+OWNER_OFFSET = 8
+HOLDER_SLICE_DTYPE = np.dtype([
+    ('owner', 'u1', (32,)),
+    ('total_burned', '<u8'),
+    ('rank', 'u1'),
+])
+
+def _slot_column(records: np.ndarray, name: str) -> np.ndarray:
+    # Sliced fetches may not include the slot fields
+    if name in records.dtype.names:
+        return np.ascontiguousarray(records[name])
+    return np.zeros(len(records), dtype=np.uint64)
+
+class HolderTable:
+    """Columnar AtomID holder snapshot: one contiguous array per field, no per-holder objects"""
+
+    def __init__(self, owners: np.ndarray, total_burned: np.ndarray, rank: np.ndarray,
+                 created_at_slot: np.ndarray, updated_at_slot: np.ndarray):
+        self.owners = owners                    # (n, 32) uint8
+        self.total_burned = total_burned        # (n,) uint64
+        self.rank = rank                        # (n,) uint8
+        self.created_at_slot = created_at_slot  # (n,) uint64
+        self.updated_at_slot = updated_at_slot  # (n,) uint64
+
+    @classmethod
+    def empty(cls) -> "HolderTable":
+        return cls(np.zeros((0, 32), dtype=np.uint8), np.zeros(0, dtype=np.uint64),
+                   np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64))
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> "HolderTable":
+        """Copy the decoded fields out of a structured record array into compact columns"""
+        return cls(
+            np.ascontiguousarray(records['owner']),
+            np.ascontiguousarray(records['total_burned']),
+            np.ascontiguousarray(records['rank']),
+            _slot_column(records, 'created_at_slot'),
+            _slot_column(records, 'updated_at_slot'),
+        )
+
+    @classmethod
+    def concat(cls, tables: List["HolderTable"]) -> "HolderTable":
+        if not tables:
+            return cls.empty()
+        return cls(
+            np.concatenate([t.owners for t in tables]),
+            np.concatenate([t.total_burned for t in tables]),
+            np.concatenate([t.rank for t in tables]),
+            np.concatenate([t.created_at_slot for t in tables]),
+            np.concatenate([t.updated_at_slot for t in tables]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.total_burned)
+
+    def owner(self, i: int) -> Pubkey:
+        return Pubkey(self.owners[i].tobytes())
+
+    def __getitem__(self, i: int) -> Tuple[Pubkey, int, int]:
+        return self.owner(i), int(self.total_burned[i]), int(self.rank[i])
+
+    def __iter__(self) -> Iterator[Tuple[Pubkey, int, int]]:
+        for i in range(len(self)):
+            yield self[i]
+
+def account_bytes(data) -> bytes:
+    """Raw account bytes from an RPC account's `data` field"""
+    if isinstance(data, (list, tuple)):
+        return base64.b64decode(data[0])
+    return bytes(data)
+
+def decode_accounts(datas: Iterable[bytes], dtype: np.dtype = ACCOUNT_DTYPE) -> HolderTable:
+    """Decode raw AtomID account bodies into a HolderTable in one vectorized pass.
+
+    All bodies are joined into a single buffer and viewed through `dtype`, so no
+    per-account objects are created. Bodies of the wrong size are skipped.
+    """
+    buffer = b"".join(data for data in datas if len(data) == dtype.itemsize)
+    records = np.frombuffer(buffer, dtype=dtype)
+    return HolderTable.from_records(records)
+
+async def get_atomid_holders(client: AsyncClient) -> HolderTable:
+    """Get all AtomID holders with their burned amounts and ranks"""
+    print(f"\n🔍 Fetching AtomID holders from program {ATOMID_PROGRAM_ID}...")
+
+    try:
+        from solana.rpc.commitment import Confirmed
+
+        # Fetch all AtomID accounts from the program
+        response = await client.get_program_accounts(
+            ATOMID_PROGRAM_ID,
+            commitment=Confirmed,
+            encoding="base64",
+            filters=[ATOMID_ACCOUNT_SIZE]
+        )
+
+        if not response or not hasattr(response, 'value'):
+            print(f"❌ Invalid response from RPC")
+            return HolderTable.empty()
+
+        print(f"📊 Processing {len(response.value)} AtomID accounts...")
+        holders = decode_accounts(account_bytes(account.account.data) for account in response.value)
+
+        print(f"✅ Found {len(holders)} AtomID holders")
+        return holders
+
+    except Exception as e:
+        print(f"❌ Error fetching AtomID holders: {e}")
+        import traceback
+        traceback.print_exc()
+        return HolderTable.empty()
+
+async def get_sliced_holders(client: AsyncClient, shard_bytes: int = 1, concurrency: int = 16) -> HolderTable:
+    """Get all AtomID holders, downloading only the 41 decoded bytes of each account.
+
+    With `shard_bytes=1` the query is split into 256 getProgramAccounts calls, one per
+    first byte of the owner, run `concurrency` at a time. Each shard is decoded as soon
+    as it arrives, so only a few raw responses are held in memory at once.
+    """
+    from solana.rpc.commitment import Confirmed
+
+    print(f"\n🔍 Fetching AtomID holders from program {ATOMID_PROGRAM_ID} ({256 ** shard_bytes} shards)...")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    data_slice = DataSliceOpts(offset=OWNER_OFFSET, length=HOLDER_SLICE_DTYPE.itemsize)
+
+    async def fetch_shard(prefix: bytes) -> HolderTable:
+        filters = [ATOMID_ACCOUNT_SIZE]
+        if prefix:
+            filters.append(MemcmpOpts(offset=OWNER_OFFSET, bytes=base58.b58encode(prefix).decode()))
+
+        async with semaphore:
+            response = await client.get_program_accounts(
+                ATOMID_PROGRAM_ID,
+                commitment=Confirmed,
+                encoding="base64",
+                data_slice=data_slice,
+                filters=filters
+            )
+        return decode_accounts((account_bytes(account.account.data) for account in response.value),
+                               dtype=HOLDER_SLICE_DTYPE)
+
+    try:
+        prefixes = [i.to_bytes(shard_bytes, 'big') for i in range(256 ** shard_bytes)] if shard_bytes else [b""]
+        holders = HolderTable.concat(await asyncio.gather(*(fetch_shard(prefix) for prefix in prefixes)))
+
+        print(f"✅ Found {len(holders)} AtomID holders")
+        return holders
+
+    except Exception as e:
+        print(f"❌ Error fetching AtomID holders: {e}")
+        import traceback
+        traceback.print_exc()
+        return HolderTable.empty()
@@ -1,28 +1,67 @@
+from __future__ import annotations
+
+# Imported first so startup timing covers every import below
+from startup_profile import mark, print_report, report
+
+# Loaded before the project modules below, which read their settings at import time
+from dotenv import load_dotenv
+load_dotenv()
+
 import os
 from solders.pubkey import Pubkey
 from solders.keypair import Keypair
 from solana.rpc.async_api import AsyncClient
-from solana.rpc.types import TxOpts
-from dotenv import load_dotenv
 import asyncio
 import base58
-from typing import List, Tuple
-from supabase import create_client, Client
+import sys
+import fcntl
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Union
 from logger import CollectorLogger
-
-load_dotenv()
+from journal import DistributionJournal, CONFIRMED, FAILED
+from vaults import WSOL_MINT, build_claim_tx, claim_compute_budget, plan_vaults, scan_vaults, send_claim, wsol_by_creator
+from priority_fees import ComputeBudget, PRIORITY_FEES
+from preflight import BATCH_PREFLIGHT
+import metrics
+from metrics import InstrumentedClient
+
+# Supabase, numpy and the payout pipeline are imported where they are used, so the
+# common hourly run that finds nothing to claim never pays for loading them
+if TYPE_CHECKING:
+    import numpy as np
+    from supabase import Client
+    from atomid import HolderTable
+
+mark("imports")
 
 logger = CollectorLogger()
 
 # Configuration
 MIN_CLAIM = 0.01  # Minimum SOL to trigger auto-claim
+DISTRIBUTION_PERCENT = 80  # Share of claimed fees paid to AtomID holders
+# Holder rewards accrue across runs and are paid once they reach this many lamports.
+# The default (0.001 SOL) is above the rent-exempt minimum, so transfers to new accounts succeed.
+PAYOUT_THRESHOLD_LAMPORTS = int(os.getenv("PAYOUT_THRESHOLD_LAMPORTS", "1000000"))
+PAYOUT_CONCURRENCY = int(os.getenv("PAYOUT_CONCURRENCY", "8"))  # Payout transactions kept in flight
+PAYOUT_HISTORY_CHUNK = 1000  # Rows per request when writing a run's payouts to Supabase
 
-PUMP_PROGRAM_ID = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
-PUMP_AMM_PROGRAM_ID = Pubkey.from_string("pAMMBay6oceH9fJKBRHGP5D4bD4sWpmSwMn52FMfXEA")
-RAYDIUM_AMM_PROGRAM = Pubkey.from_string("675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8")
-ATOMID_PROGRAM_ID = Pubkey.from_string("rnc2fycemiEgj4YbMSuwKFpdV6nkJonojCXib3j2by6")
 RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
 
+# Quote mints whose creator vaults are claimed (comma-separated, defaults to WSOL)
+QUOTE_MINTS = [Pubkey.from_string(m.strip()) for m in os.getenv("QUOTE_MINTS", str(WSOL_MINT)).split(",") if m.strip()]
+
+# Daemon mode (automain.py --daemon)
+RUN_LOCK_PATH = os.getenv("RUN_LOCK_PATH", "automain.lock")
+DAEMON_POLL_INTERVAL = int(os.getenv("DAEMON_POLL_INTERVAL", "3600"))  # Fallback vault check, seconds
+DAEMON_RECONNECT_DELAY = 5
+
+# Print per-phase startup timing (also enabled with --profile-startup)
+STARTUP_TIMING = os.getenv("STARTUP_TIMING", "0") == "1"
+
+mark("config")
+
 def load_wallet():
     private_key = os.getenv("WALLET_PRIVATE_KEY")
     if not private_key:
@@ -34,8 +73,30 @@ def load_wallet():
     except Exception as e:
         raise ValueError(f"Invalid private key format: {e}")
 
+@lru_cache(maxsize=1)
+def load_wallets() -> List[Keypair]:
+    """Main wallet plus any extra creator wallets from CREATOR_PRIVATE_KEYS (comma-separated)"""
+    wallets = [load_wallet()]
+
+    for private_key in filter(None, (k.strip() for k in os.getenv("CREATOR_PRIVATE_KEYS", "").split(","))):
+        try:
+            wallets.append(Keypair.from_bytes(base58.b58decode(private_key)))
+        except Exception as e:
+            raise ValueError(f"Invalid private key in CREATOR_PRIVATE_KEYS: {e}")
+
+    return list({w.pubkey(): w for w in wallets}.values())
+
+def new_rpc_client() -> AsyncClient:
+    """Pooled client over SOLANA_RPC_URLS (or SOLANA_RPC_URL) whose calls are timed in the run's metrics"""
+    from rpc_pool import RpcPool, SOLANA_RPC_URLS
+
+    return InstrumentedClient(RpcPool(SOLANA_RPC_URLS or [RPC_URL]))
+
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
-    """Initialize Supabase client"""
+    """Initialize Supabase client (created once per process)"""
+    from supabase import create_client
+
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
 
@@ -45,39 +106,16 @@ def get_supabase_client() -> Client:
     return create_client(url, key)
 
 def update_stats(claimed_amount: float):
-    """Update statistics in Supabase after successful payout"""
+    """Update statistics in Supabase after successful payout (on the logger thread, off the critical path)"""
+    logger.submit(partial(_update_stats, claimed_amount))
+
+def _update_stats(claimed_amount: float):
     try:
-        supabase = get_supabase_client()
-
-        # Get current stats
-        result = supabase.from_('fee_collector_stats').select('*').eq('id', '00000000-0000-0000-0000-000000000001').maybe_single().execute()
-
-        if result.data:
-            # Update existing record
-            new_total = float(result.data['total_sol_paid']) + claimed_amount
-            new_count = result.data['successful_executions'] + 1
-
-            from datetime import datetime, timezone
-            now = datetime.now(timezone.utc).isoformat()
-
-            supabase.from_('fee_collector_stats').update({
-                'total_sol_paid': new_total,
-                'successful_executions': new_count,
-                'last_payout_amount': claimed_amount,
-                'last_payout_at': now,
-                'updated_at': now
-            }).eq('id', '00000000-0000-0000-0000-000000000001').execute()
-        else:
-            # Insert first record
-            from datetime import datetime, timezone
-            now = datetime.now(timezone.utc).isoformat()
-
-            supabase.from_('fee_collector_stats').insert({
-                'id': '00000000-0000-0000-0000-000000000001',
-                'total_sol_paid': claimed_amount,
-                'successful_executions': 1,
-                'last_payout_amount': claimed_amount,
-                'last_payout_at': now
+        # Atomic server-side increment (supabase/migrations/002_increment_collector_stats.sql)
+        with metrics.current().timed("supabase", "increment_collector_stats"):
+            get_supabase_client().rpc('increment_collector_stats', {
+                'p_sol_paid': claimed_amount,
+                'p_executions': 1
             }).execute()
 
         print(f"📊 Statistics updated: +{claimed_amount:.9f} SOL")
@@ -86,261 +124,229 @@ def update_stats(claimed_amount: float):
 
 def update_execution_timestamp():
     """Update last execution timestamp without changing stats (for timer continuity)"""
-    try:
-        supabase = get_supabase_client()
-
-        # Get current stats
-        result = supabase.from_('fee_collector_stats').select('*').eq('id', '00000000-0000-0000-0000-000000000001').maybe_single().execute()
-
-        from datetime import datetime, timezone
-        now = datetime.now(timezone.utc).isoformat()
+    logger.submit(_update_execution_timestamp)
 
-        if result.data:
-            # Update only the timestamp
-            supabase.from_('fee_collector_stats').update({
-                'last_payout_at': now,
-                'updated_at': now
-            }).eq('id', '00000000-0000-0000-0000-000000000001').execute()
-            print(f"📊 Execution timestamp updated")
-        else:
-            # Insert initial record with zero stats
-            supabase.from_('fee_collector_stats').insert({
-                'id': '00000000-0000-0000-0000-000000000001',
-                'total_sol_paid': 0,
-                'successful_executions': 0,
-                'last_payout_amount': 0,
-                'last_payout_at': now
+def _update_execution_timestamp():
+    try:
+        with metrics.current().timed("supabase", "increment_collector_stats"):
+            get_supabase_client().rpc('increment_collector_stats', {
+                'p_sol_paid': 0,
+                'p_executions': 0
             }).execute()
-            print(f"📊 Initial stats record created")
+
+        print(f"📊 Execution timestamp updated")
     except Exception as e:
         print(f"⚠️  Warning: Failed to update execution timestamp: {e}")
 
-async def get_account_balance(client: AsyncClient, account: Pubkey) -> tuple[float, dict]:
-    """Get native SOL balance from account (for pump vault)"""
-    try:
-        response = await client.get_account_info(account)
-        if response.value is None:
-            return 0.0, {"exists": False}
-
-        lamports = response.value.lamports
-        data_len = len(response.value.data) if response.value.data else 0
-
-        rent_response = await client.get_minimum_balance_for_rent_exemption(data_len)
-        rent_exempt_minimum = rent_response.value
-
-        claimable_lamports = max(0, lamports - rent_exempt_minimum)
-        sol_amount = claimable_lamports / 1_000_000_000
-
-        debug_info = {
-            "exists": True,
-            "total_lamports": lamports,
-            "total_sol": lamports / 1_000_000_000,
-            "data_len": data_len,
-            "rent_exempt_minimum": rent_exempt_minimum,
-            "rent_exempt_sol": rent_exempt_minimum / 1_000_000_000,
-            "claimable_lamports": claimable_lamports,
-            "claimable_sol": sol_amount
-        }
-
-        return sol_amount, debug_info
-    except Exception as e:
-        return 0.0, {"error": str(e)}
+async def record_payout_history(journal: DistributionJournal, wallet: Pubkey, run_id: int):
+    """Bulk-insert a finished run's confirmed payouts into the Supabase payouts table.
+
+    The insert runs on the logger thread but is awaited, and the journal only notes the
+    run as recorded once it succeeded; resume_unfinished_runs retries the others.
+    """
+    if not logger.enabled:
+        return
+
+    payouts = journal.confirmed(run_id)
+    if payouts:
+        loop = asyncio.get_running_loop()
+        recorded = loop.create_future()
+        logger.submit(lambda: loop.call_soon_threadsafe(
+            recorded.set_result, _record_payout_history(wallet, run_id, payouts)))
+        if not await recorded:
+            return
+    journal.mark_history_recorded(run_id)
 
-async def get_token_account_balance(client: AsyncClient, token_account: Pubkey) -> tuple[float, dict]:
-    """Get token balance from a token account (for AMM vaults which are ATAs holding WSOL)"""
+def _record_payout_history(wallet: Pubkey, run_id: int, payouts: List[tuple]) -> bool:
+    from postgrest.types import ReturnMethod
+
+    rows = [{'wallet': str(wallet), 'run_id': run_id, 'recipient': str(recipient),
+             'lamports': lamports, 'tx_signature': signature}
+            for recipient, lamports, signature in payouts]
     try:
-        response = await client.get_token_account_balance(token_account)
-        if response.value is None:
-            return 0.0, {"exists": False}
-
-        # Get token amount from the response
-        amount = int(response.value.amount)
-        decimals = response.value.decimals
-        ui_amount = response.value.ui_amount
-
-        sol_amount = amount / (10 ** decimals)
-
-        debug_info = {
-            "exists": True,
-            "amount": amount,
-            "decimals": decimals,
-            "ui_amount": ui_amount,
-            "sol_amount": sol_amount
-        }
-
-        return sol_amount, debug_info
+        # (tx_signature, recipient) is unique, so a resumed run re-sending its history is a no-op
+        # (supabase/migrations/004_payouts.sql); chunked only to bound the request size
+        for i in range(0, len(rows), PAYOUT_HISTORY_CHUNK):
+            with metrics.current().timed("supabase", "insert_payouts"):
+                get_supabase_client().table('payouts').upsert(
+                    rows[i:i + PAYOUT_HISTORY_CHUNK], on_conflict='tx_signature,recipient',
+                    ignore_duplicates=True, returning=ReturnMethod.minimal
+                ).execute()
+
+        print(f"📊 Payout history recorded: {len(rows)} payouts of run {run_id}")
+        return True
     except Exception as e:
-        return 0.0, {"error": str(e)}
+        print(f"⚠️  Warning: Failed to record payout history for run {run_id}, will retry next run: {e}")
+        return False
 
-async def collect_creator_fees(creator_keypair: Keypair):
-    client = AsyncClient(RPC_URL)
+def prune_logs():
+    """Trim collector_logs to its configured retention (also scheduled with pg_cron where available)"""
+    if logger.enabled:
+        logger.submit(_prune_logs)
 
+def _prune_logs():
     try:
-        creator_pubkey = creator_keypair.pubkey()
-        wsol_mint = Pubkey.from_string("So11111111111111111111111111111111111111112")
+        # Batch pruning replaces the per-insert trigger (supabase/migrations/003_collector_log_retention.sql)
+        with metrics.current().timed("supabase", "prune_collector_logs"):
+            deleted = get_supabase_client().rpc('prune_collector_logs', {}).execute().data
+
+        if deleted:
+            print(f"🧹 Pruned {deleted} old log entries")
+    except Exception as e:
+        print(f"⚠️  Warning: Failed to prune logs: {e}")
+
+async def collect_creator_fees(creator_keypairs: Union[Keypair, List[Keypair]],
+                               quote_mints: Optional[List[Pubkey]] = None,
+                               client: Optional[AsyncClient] = None, dry_run: bool = False,
+                               on_claimable: Optional[Callable[[Dict[Pubkey, float]], None]] = None
+                               ) -> Dict[Pubkey, float]:
+    """Claim AMM creator fees for every creator wallet and quote mint.
+
+    Returns the SOL (WSOL) claimed per creator wallet, counting only confirmed claims.
+    `on_claimable` gets the SOL about to be claimed per wallet right before the claims are
+    sent. With `dry_run` the claims are only simulated, and the SOL they would claim is
+    returned.
+    """
+    if isinstance(creator_keypairs, Keypair):
+        creator_keypairs = [creator_keypairs]
+    quote_mints = quote_mints or QUOTE_MINTS
+
+    owns_client = client is None
+    if owns_client:
+        client = new_rpc_client()
 
-        print(f"Creator Wallet: {creator_pubkey}")
+    try:
+        for creator in creator_keypairs:
+            print(f"Creator Wallet: {creator.pubkey()}")
         print()
 
-        # Check AMM vault (DEX trading fees)
+        # Every PDA is derived once, then all vault state comes back in one batched fetch
+        with metrics.current().phase("vault_check"):
+            vaults = plan_vaults(creator_keypairs, quote_mints)
+            await scan_vaults(client, vaults)
+        mark("vault scan")
+
+        # Check AMM vaults (DEX trading fees)
         print("─" * 60)
-        print("AMM VAULT (DEX trading fees):")
+        print("AMM VAULTS (DEX trading fees):")
         print("─" * 60)
 
-        total_amm_balance = 0.0
-        amm_vaults_with_balance = []
-
-        # Derive the vault authority using YOUR wallet (coin_creator)
-        vault_authority = Pubkey.find_program_address(
-            [b"creator_vault", bytes(creator_pubkey)],
-            PUMP_AMM_PROGRAM_ID
-        )[0]
-
-        token_program = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-
-        # The AMM vault is a single ATA for all your tokens
-        coin_vault = Pubkey.find_program_address(
-            [bytes(vault_authority), bytes(token_program), bytes(wsol_mint)],
-            Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
-        )[0]
-
-        print(f"Vault Authority: {vault_authority}")
-        print(f"AMM Vault (ATA): {coin_vault}")
-        print()
-
-        balance, debug = await get_token_account_balance(client, coin_vault)
-
-        if debug.get("exists"):
-            print(f"Status: ✅ Vault exists")
-            print(f"Token Balance: {debug.get('ui_amount', 0):.9f} WSOL")
-            print(f"Claimable: {balance:.9f} SOL")
-            print(f"Debug: amount={debug.get('amount', 0)}, decimals={debug.get('decimals', 9)}")
+        for vault in vaults:
+            symbol = "WSOL" if vault.is_wsol else str(vault.mint)
+            print(f"Vault Authority: {vault.vault_authority}")
+            print(f"AMM Vault (ATA): {vault.coin_vault}")
+
+            if vault.vault_exists:
+                print(f"Status: ✅ Vault exists")
+                print(f"Token Balance: {vault.ui_amount:.9f} {symbol}")
+                print(f"Debug: amount={vault.amount}, decimals={vault.decimals}")
+            else:
+                print(f"Status: ❌ Vault not created yet (no AMM fees)")
             print()
 
-            if balance > 0:
-                total_amm_balance = balance
-                amm_vaults_with_balance.append((coin_vault, balance))
-        else:
-            print(f"Status: ❌ Vault not created yet (no AMM fees)")
-            if "error" in debug:
-                print(f"Error: {debug['error']}")
-
         print("─" * 60)
         print()
 
-        total_balance = total_amm_balance
+        total_balance = sum(v.ui_amount for v in vaults if v.is_wsol)
         print(f"💰 TOTAL CLAIMABLE: {total_balance:.9f} SOL")
-        print(f"   └─ AMM Fees: {total_amm_balance:.9f} SOL")
+        print(f"   └─ AMM Fees: {total_balance:.9f} SOL across {len(creator_keypairs)} wallet(s)")
         print()
 
-        if total_balance == 0:
-            print("No fees to claim.")
-            update_execution_timestamp()
-            return 0.0
+        claimable = [v for v in vaults if v.amount > 0 and v.ui_amount >= MIN_CLAIM]
 
-        if total_balance < MIN_CLAIM:
-            print(f"⏭️  Skipping claim (below {MIN_CLAIM} SOL threshold)")
-            logger.info(f"Claimable amount {total_balance:.9f} SOL below threshold {MIN_CLAIM} SOL")
-            update_execution_timestamp()
-            return 0.0
+        if not claimable:
+            if any(v.amount > 0 for v in vaults):
+                print(f"⏭️  Skipping claim (below {MIN_CLAIM} SOL threshold)")
+                logger.info(f"Claimable amount {total_balance:.9f} SOL below threshold {MIN_CLAIM} SOL")
+            else:
+                print("No fees to claim.")
+            if not dry_run:
+                update_execution_timestamp()
+            return {}
 
+        claimable_sol = sum(v.ui_amount for v in claimable if v.is_wsol)
         print(f"✅ Claimable amount >= {MIN_CLAIM} SOL, proceeding automatically...")
-        logger.info(f"Found claimable amount: {total_balance:.9f} SOL", sol_amount=total_balance)
+        logger.info(f"Found claimable amount: {claimable_sol:.9f} SOL in {len(claimable)} vault(s)",
+                    sol_amount=claimable_sol)
         print()
 
-        from solders.transaction import Transaction as SoldersTransaction
-        from solders.instruction import Instruction, AccountMeta
-
-        claimed_total = 0
-
-        if total_amm_balance > 0:
-            print(f"\nClaiming {total_amm_balance:.9f} SOL from AMM vault...")
-
-            amm_event_authority = Pubkey.find_program_address([b"__event_authority"], PUMP_AMM_PROGRAM_ID)[0]
-            token_program = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-            ata_program = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
-            system_program = Pubkey.from_string("11111111111111111111111111111111")
-
-            creator_wsol_ata_pda = Pubkey.find_program_address(
-                [bytes(creator_pubkey), bytes(token_program), bytes(wsol_mint)],
-                ata_program
-            )[0]
-
-            coin_vault, balance = amm_vaults_with_balance[0]
-
-            coin_creator_vault_authority = Pubkey.find_program_address(
-                [b"creator_vault", bytes(creator_pubkey)],
-                PUMP_AMM_PROGRAM_ID
-            )[0]
-
-            try:
-                instructions = []
-
-                # Check if WSOL ATA exists, if not create it
-                ata_info = await client.get_account_info(creator_wsol_ata_pda)
-                if ata_info.value is None:
-                    print("Creating WSOL token account...")
-                    # Create Associated Token Account instruction
-                    create_ata_ix = Instruction(
-                        ata_program,
-                        bytes([]),  # Empty data for create instruction
-                        [
-                            AccountMeta(creator_pubkey, is_signer=True, is_writable=True),
-                            AccountMeta(creator_wsol_ata_pda, is_signer=False, is_writable=True),
-                            AccountMeta(creator_pubkey, is_signer=False, is_writable=False),
-                            AccountMeta(wsol_mint, is_signer=False, is_writable=False),
-                            AccountMeta(system_program, is_signer=False, is_writable=False),
-                            AccountMeta(token_program, is_signer=False, is_writable=False),
-                        ]
-                    )
-                    instructions.append(create_ata_ix)
-
-                # collect_coin_creator_fee discriminator: [160,57,89,42,181,139,43,66]
-                instruction_data = bytes([160, 57, 89, 42, 181, 139, 43, 66])
-
-                accounts = [
-                    AccountMeta(wsol_mint, is_signer=False, is_writable=False),
-                    AccountMeta(token_program, is_signer=False, is_writable=False),
-                    AccountMeta(creator_pubkey, is_signer=False, is_writable=False),
-                    AccountMeta(coin_creator_vault_authority, is_signer=False, is_writable=False),
-                    AccountMeta(coin_vault, is_signer=False, is_writable=True),
-                    AccountMeta(creator_wsol_ata_pda, is_signer=False, is_writable=True),
-                    AccountMeta(amm_event_authority, is_signer=False, is_writable=False),
-                    AccountMeta(PUMP_AMM_PROGRAM_ID, is_signer=False, is_writable=False),
-                ]
-
-                claim_ix = Instruction(PUMP_AMM_PROGRAM_ID, instruction_data, accounts)
-                instructions.append(claim_ix)
-
-                # Add close WSOL account instruction to unwrap WSOL back to SOL
-                close_account_ix = Instruction(
-                    token_program,
-                    bytes([9]),  # CloseAccount instruction discriminator
-                    [
-                        AccountMeta(creator_wsol_ata_pda, is_signer=False, is_writable=True),
-                        AccountMeta(creator_pubkey, is_signer=False, is_writable=True),
-                        AccountMeta(creator_pubkey, is_signer=True, is_writable=False),
-                    ]
-                )
-                instructions.append(close_account_ix)
-
-                recent_blockhash = await client.get_latest_blockhash()
-                tx = SoldersTransaction.new_signed_with_payer(
-                    instructions,
-                    creator_pubkey,
-                    [creator_keypair],
-                    recent_blockhash.value.blockhash
-                )
-
-                result = await client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=False))
-                print(f"✅ AMM claim successful! WSOL automatically converted to SOL")
-                print(f"   Signature: {result.value}")
-                logger.success(f"Claimed {balance:.9f} SOL from AMM vault",
-                             sol_amount=balance, tx_signature=str(result.value))
-                claimed_total += balance
-            except Exception as e:
-                print(f"❌ AMM claim failed: {e}")
-                logger.error(f"AMM claim failed: {str(e)}")
+        if on_claimable:
+            # Lets the caller fetch holders and allocate while the claims are in flight
+            on_claimable(wsol_by_creator(claimable))
+
+        recent_blockhash = await client.get_latest_blockhash()
+        blockhash = recent_blockhash.value.blockhash
+        budget = ComputeBudget(client) if PRIORITY_FEES else None
+
+        # Simulate every claim up front so the sends can skip the node's own preflight
+        if BATCH_PREFLIGHT or dry_run:
+            from preflight import preflight_claims
+
+            with metrics.current().phase("preflight"):
+                preflight = await preflight_claims(client, claimable, blockhash, budget)
+            preflight.print("claims")
+            for vault, error in preflight.rejected:
+                print(f"❌ AMM claim simulation failed for {vault.creator_pubkey}: {error}")
+                logger.error(f"AMM claim simulation failed: {error}",
+                             metadata={'creator': str(vault.creator_pubkey), 'mint': str(vault.mint)})
+            claimable = preflight.passed
+
+            if dry_run:
+                would_claim = wsol_by_creator(claimable)
+                print(f"\n🧪 Dry run: would claim {sum(would_claim.values()):.9f} SOL, nothing sent")
+                return would_claim
+
+        from payouts import BlockhashCache
+        from confirmations import ConfirmationTracker
+
+        claimed: Dict[Pubkey, float] = {}
+
+        def on_confirmed(confirmation):
+            vault = confirmation.payload
+            metadata = {'creator': str(vault.creator_pubkey), 'mint': str(vault.mint)}
+            if not confirmation.ok:
+                print(f"❌ AMM claim failed for {vault.creator_pubkey}: {confirmation.error}")
+                logger.error(f"AMM claim failed: {confirmation.error}", tx_signature=confirmation.signature,
+                             metadata=metadata)
+                return
+
+            if vault.is_wsol:
+                print(f"✅ AMM claim confirmed! WSOL automatically converted to SOL")
+                claimed[vault.creator_pubkey] = claimed.get(vault.creator_pubkey, 0.0) + vault.ui_amount
+            else:
+                print(f"✅ AMM claim confirmed! {vault.ui_amount} of {vault.mint} sent to creator")
+            print(f"   Signature: {confirmation.signature}")
+            logger.success(f"Claimed {vault.ui_amount:.9f} {'SOL' if vault.is_wsol else vault.mint} from AMM vault",
+                           sol_amount=vault.ui_amount if vault.is_wsol else None,
+                           tx_signature=confirmation.signature, metadata=metadata)
+
+        tracker = ConfirmationTracker(client, BlockhashCache(client), on_confirmed=on_confirmed)
+
+        async def claim(vault):
+            compute_budget = await claim_compute_budget(vault, blockhash, budget)
+            signature = await send_claim(client, vault, blockhash, compute_budget=compute_budget,
+                                         skip_preflight=BATCH_PREFLIGHT)
+            tracker.track(signature, recent_blockhash.value.last_valid_block_height,
+                          partial(build_claim_tx, vault, compute_budget=compute_budget), payload=vault)
+            return signature
+
+        print(f"\nClaiming {len(claimable)} AMM vault(s) concurrently...")
+        with metrics.current().phase("claim"):
+            results = await asyncio.gather(*(claim(vault) for vault in claimable), return_exceptions=True)
+
+        for vault, result in zip(claimable, results):
+            if isinstance(result, Exception):
+                print(f"❌ AMM claim failed for {vault.creator_pubkey}: {result}")
+                logger.error(f"AMM claim failed: {str(result)}",
+                             metadata={'creator': str(vault.creator_pubkey), 'mint': str(vault.mint)})
+            else:
+                print(f"📨 Claim sent for {vault.creator_pubkey} ({result})")
+
+        # Only confirmed claims count, since payouts are funded from them
+        with metrics.current().phase("claim_confirm"):
+            await tracker.wait()
+
+        claimed_total = sum(claimed.values())
 
         if claimed_total > 0:
             print()
@@ -350,183 +356,133 @@ async def collect_creator_fees(creator_keypair: Keypair):
             # Update statistics in Supabase
             update_stats(claimed_total)
 
-            return claimed_total
-
-        return 0.0
+        return claimed
 
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
-        return 0.0
+        return {}
 
     finally:
-        await client.close()
-
-async def get_atomid_holders(client: AsyncClient) -> List[Tuple[Pubkey, int, int]]:
-    """Get all AtomID holders with their burned amounts and ranks"""
-    print(f"\n🔍 Fetching AtomID holders from program {ATOMID_PROGRAM_ID}...")
+        if owns_client:
+            await client.close()
+
+@dataclass
+class PreparedDistribution:
+    """Holder snapshot and allocation of one claim, computed before the claim confirms"""
+    holders: HolderTable
+    claimed_lamports: int
+    distributable_lamports: int
+    allocations: Optional[np.ndarray]
+
+def prepare_distribution(holders: HolderTable, claimed_amount: float) -> PreparedDistribution:
+    """Split DISTRIBUTION_PERCENT of a claim across holders in integer lamports"""
+    from allocation import allocate_lamports, sol_to_lamports
+
+    claimed_lamports = sol_to_lamports(claimed_amount)
+    distributable_lamports = claimed_lamports * DISTRIBUTION_PERCENT // 100
+    allocations = None
+    if len(holders) > 0:
+        # Every holder gets an exact share; shares accrue until they reach the payout threshold
+        with metrics.current().phase("allocation"):
+            allocations = allocate_lamports(holders.total_burned, distributable_lamports)
+    return PreparedDistribution(holders, claimed_lamports, distributable_lamports, allocations)
+
+async def fetch_holders(client: AsyncClient) -> HolderTable:
+    from holder_index import load_holders
+
+    with metrics.current().phase("holder_fetch"):
+        return await load_holders(client)
+
+async def prefetch_distribution(holders: Awaitable[HolderTable], claimed_amount: float) -> PreparedDistribution:
+    return prepare_distribution(await holders, claimed_amount)
+
+async def distribute_rewards(wallet: Keypair, claimed_amount: float, client: Optional[AsyncClient] = None,
+                             journal: Optional[DistributionJournal] = None, dry_run: bool = False,
+                             prepared: Optional[Awaitable[PreparedDistribution]] = None):
+    """Distribute 80% of claimed rewards to AtomID holders based on burned amounts.
+
+    `prepared` is a holder snapshot and allocation started while the claim was in flight;
+    without it holders are fetched here. With `dry_run` the payouts are simulated and
+    costed, and the journal is left untouched.
+    """
+    import numpy as np
+    from allocation import sol_to_lamports
 
-    try:
-        from solana.rpc.types import MemcmpOpts
-        from solana.rpc.commitment import Confirmed
-        import struct
-
-        # Fetch all AtomID accounts from the program
-        response = await client.get_program_accounts(
-            ATOMID_PROGRAM_ID,
-            commitment=Confirmed,
-            encoding="base64",
-            filters=[
-                # Account discriminator for AtomID accounts (8 bytes)
-                # Data size filter: 8 (discriminator) + 32 (owner) + 8 (total_burned) + 1 (rank) + 204 (metadata) + 8 (created_at) + 8 (updated_at) + 1 (bump)
-                270
-            ]
-        )
-
-        if not response or not hasattr(response, 'value'):
-            print(f"❌ Invalid response from RPC")
-            return []
-
-        print(f"📊 Processing {len(response.value)} AtomID accounts...")
-        holders = []
-
-        for account in response.value:
-            try:
-                # Decode base64 data
-                data = base58.b58decode(account.account.data[0]) if isinstance(account.account.data, list) else account.account.data
-
-                # AtomID account layout:
-                # - 8 bytes: discriminator
-                # - 32 bytes: owner (Pubkey)
-                # - 8 bytes: total_burned (u64)
-                # - 1 byte: rank (u8)
-                # - 204 bytes: metadata (String with length prefix)
-                # - 8 bytes: created_at_slot (u64)
-                # - 8 bytes: updated_at_slot (u64)
-                # - 1 byte: bump
-
-                if len(data) >= 49:  # At least discriminator + owner + total_burned + rank
-                    owner_bytes = data[8:40]  # Skip 8-byte discriminator
-                    total_burned_bytes = data[40:48]
-                    rank = data[48]
-
-                    owner = Pubkey(owner_bytes)
-                    total_burned = struct.unpack('<Q', total_burned_bytes)[0]
-
-                    holders.append((owner, total_burned, rank))
-            except Exception as e:
-                print(f"⚠️  Error parsing account: {e}")
-                continue
-
-        print(f"✅ Found {len(holders)} AtomID holders")
-        return holders
-
-    except Exception as e:
-        print(f"❌ Error fetching AtomID holders: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-async def distribute_rewards(wallet: Keypair, claimed_amount: float):
-    """Distribute 80% of claimed rewards to AtomID holders based on burned amounts"""
     print("\n" + "=" * 60)
     print("Reward Distribution to AtomID Holders")
     print("=" * 60)
 
-    client = AsyncClient(RPC_URL)
+    owns_client = client is None
+    if owns_client:
+        client = new_rpc_client()
+
+    owns_journal = journal is None
+    if owns_journal:
+        journal = DistributionJournal()
 
     try:
-        holders = await get_atomid_holders(client)
+        if prepared is not None:
+            distribution = await prepared
+            if distribution.claimed_lamports != sol_to_lamports(claimed_amount):
+                # Allocated from the scanned vault balance, but not every claim confirmed
+                distribution = prepare_distribution(distribution.holders, claimed_amount)
+        else:
+            distribution = prepare_distribution(await fetch_holders(client), claimed_amount)
 
-        if not holders:
+        holders = distribution.holders
+        if len(holders) == 0:
             print("❌ No AtomID holders found")
             return
 
-        # Calculate distribution
-        distributable = claimed_amount * 0.8
-        total_burned = sum(burned for _, burned, _ in holders)
+        claimed_lamports = distribution.claimed_lamports
+        distributable_lamports = distribution.distributable_lamports
+        allocations = distribution.allocations
+        burned = holders.total_burned
+        total_burned = int(burned.sum(dtype=object))
 
         print(f"\n💰 Distribution Details:")
-        print(f"   Total Claimed: {claimed_amount:.9f} SOL")
-        print(f"   Distributable (80%): {distributable:.9f} SOL")
+        print(f"   Total Claimed: {claimed_lamports / 1e9:.9f} SOL")
+        print(f"   Distributable ({DISTRIBUTION_PERCENT}%): {distributable_lamports / 1e9:.9f} SOL")
         print(f"   Total ATOM Burned: {total_burned / 1e6:.0f}")
         print(f"   AtomID Holders: {len(holders)}")
 
-        # Calculate rewards per holder (minimum 0.000005 SOL)
-        MIN_AMOUNT_LAMPORTS = 5000
-        MIN_AMOUNT_SOL = MIN_AMOUNT_LAMPORTS / 1e9
-
-        rewards = []
-        skipped_below_min = 0
+        shares = []
+        for i in np.flatnonzero(allocations):
+            owner, holder_burned, rank = holders[i]
+            lamports = int(allocations[i])
+            shares.append((owner, lamports))
+            print(f"   • {owner}: Rank {rank}, {holder_burned / 1e6:.0f} ATOM burned → {lamports / 1e9:.9f} SOL")
 
-        for owner, burned, rank in holders:
-            share = (burned / total_burned) * distributable
-            lamports = int(share * 1e9)
-
-            if lamports < MIN_AMOUNT_LAMPORTS:
-                skipped_below_min += 1
-                continue
+        if dry_run:
+            await preview_payouts(client, wallet, journal, shares)
+            return
 
-            rewards.append((owner, share))
-            print(f"   • {owner}: Rank {rank}, {burned / 1e6:.0f} ATOM burned → {share:.9f} SOL")
+        # Record the allocation before anything is sent so a crash can resume from it
+        run_id = journal.start_run(wallet.pubkey(), claimed_lamports, distributable_lamports, shares,
+                                   payout_threshold=PAYOUT_THRESHOLD_LAMPORTS)
+        accrued_count, accrued_lamports = journal.accrued(wallet.pubkey())
 
-        if skipped_below_min > 0:
-            print(f"\n⚠️  {skipped_below_min} holders skipped (reward below {MIN_AMOUNT_SOL:.9f} SOL minimum)")
+        if accrued_count > 0:
+            print(f"\n⏳ {accrued_count} holders carry {accrued_lamports / 1e9:.9f} SOL forward "
+                  f"(below {PAYOUT_THRESHOLD_LAMPORTS / 1e9:.9f} SOL payout threshold)")
 
-        if not rewards:
-            print(f"\n❌ No holders qualify for rewards (all below minimum threshold)")
+        if run_id is None:
+            print(f"\n⏭️  No holder reached the payout threshold yet, all shares carried forward")
+            logger.info(f"All {len(shares)} shares carried forward, no payouts due",
+                        metadata={'accrued_holders': accrued_count, 'accrued_lamports': accrued_lamports})
             return
 
-        # Auto-confirm distribution
-        print(f"\n✅ Sending {sum(r[1] for r in rewards):.9f} SOL to {len(rewards)} AtomID holders...")
-
-        # Send rewards in batches
-        from solders.system_program import transfer, TransferParams
-        from solders.transaction import Transaction as SoldersTransaction
-
-        print(f"\n📤 Sending rewards...")
-        success_count = 0
-        failed_count = 0
+        due = journal.pending(run_id)
+        logger.info(f"Distribution run {run_id} journaled: {len(due)} payouts",
+                    metadata={'run_id': run_id, 'distributable_lamports': distributable_lamports,
+                              'accrued_holders': accrued_count, 'accrued_lamports': accrued_lamports})
 
-        for owner, amount in rewards:
-            try:
-                lamports = int(amount * 1e9)
-
-                transfer_ix = transfer(TransferParams(
-                    from_pubkey=wallet.pubkey(),
-                    to_pubkey=owner,
-                    lamports=lamports
-                ))
-
-                recent_blockhash = await client.get_latest_blockhash()
-                tx = SoldersTransaction.new_signed_with_payer(
-                    [transfer_ix],
-                    wallet.pubkey(),
-                    [wallet],
-                    recent_blockhash.value.blockhash
-                )
-
-                result = await client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=False))
-                print(f"   ✅ Sent {amount:.9f} SOL to {owner}")
-                logger.success(f"Distributed {amount:.9f} SOL to holder",
-                             sol_amount=amount, tx_signature=str(result.value),
-                             metadata={'recipient': str(owner)})
-                success_count += 1
-
-                await asyncio.sleep(0.5)  # Rate limiting
-
-            except Exception as e:
-                print(f"   ❌ Failed to send to {owner}: {e}")
-                failed_count += 1
+        # Auto-confirm distribution
+        print(f"\n✅ Sending {sum(lamports for _, lamports in due) / 1e9:.9f} SOL to {len(due)} AtomID holders...")
 
-        print(f"\n✅ Distribution complete!")
-        print(f"   • Successful: {success_count}/{len(rewards)}")
-        logger.info(f"Distribution completed: {success_count} successful, {failed_count} failed",
-                   metadata={'total_distributed': sum(r[1] for r in rewards[:success_count]),
-                            'recipients': success_count})
-        if failed_count > 0:
-            print(f"   • Failed: {failed_count}")
+        await execute_payouts(client, wallet, journal, run_id)
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -534,7 +490,357 @@ async def distribute_rewards(wallet: Keypair, claimed_amount: float):
         traceback.print_exc()
 
     finally:
+        if owns_journal:
+            journal.close()
+        if owns_client:
+            await client.close()
+
+async def preview_payouts(client: AsyncClient, wallet: Keypair, journal: DistributionJournal, shares):
+    """Dry run: simulate the payouts these shares would trigger and print what they would cost"""
+    from payouts import pack_transfers, BlockhashCache
+    from preflight import preflight_payouts
+    from lookup_tables import LookupTableManager, PAYOUT_LOOKUP_TABLES
+
+    due = journal.preview_run(wallet.pubkey(), shares, payout_threshold=PAYOUT_THRESHOLD_LAMPORTS)
+    if not due:
+        print(f"\n🧪 Dry run: no holder would reach the payout threshold, nothing to send")
+        return
+
+    # Only tables that already exist; creating or extending them would send transactions
+    lookup_tables, lookup = [], None
+    if PAYOUT_LOOKUP_TABLES:
+        tables = LookupTableManager(client, wallet, journal)
+        await tables.load()
+        lookup_tables, lookup = tables.accounts, tables.lookup()
+
+    batches = pack_transfers(wallet.pubkey(), due, compute_budget=PRIORITY_FEES, lookup=lookup)
+    budget = ComputeBudget(client) if PRIORITY_FEES else None
+    balance = (await client.get_balance(wallet.pubkey())).value
+
+    print(f"\n🧪 Dry run: simulating {len(due)} payouts in {len(batches)} transactions...")
+    print(f"   (simulated against the current balance of {balance / 1e9:.9f} SOL, before this run's claim)")
+    with metrics.current().phase("preflight"):
+        preflight = await preflight_payouts(client, wallet, batches, BlockhashCache(client), budget, lookup_tables)
+    preflight.print("payouts")
+    for batch, error in preflight.rejected:
+        owner, lamports = batch[0]
+        print(f"   ❌ {owner} ({lamports / 1e9:.9f} SOL): {error}")
+
+    total = preflight.transfer_lamports + preflight.fee_lamports
+    print(f"   • Total: {total / 1e9:.9f} SOL ({'covered by' if balance >= total else 'exceeds'} current balance)")
+    logger.info(f"Dry run: {len(due)} payouts simulated, {len(preflight.rejected)} rejected",
+                metadata={'wallet': str(wallet.pubkey()), 'preflight': preflight.summary()})
+
+async def execute_payouts(client: AsyncClient, wallet: Keypair, journal: DistributionJournal, run_id: int):
+    """Send every unfinished payout of a journaled run and wait until each is confirmed or failed"""
+    from payouts import pack_transfers, build_transfer_tx, PayoutSender
+    from confirmations import ConfirmationTracker
+    from lookup_tables import LookupTableManager, PAYOUT_LOOKUP_TABLES
+
+    in_flight = journal.in_flight(run_id)
+    pending = journal.pending(run_id)
+
+    # Recurring recipients are referenced through lookup tables in v0 transactions
+    lookup_tables, lookup = [], None
+    if PAYOUT_LOOKUP_TABLES:
+        tables = LookupTableManager(client, wallet, journal)
+        recipients = [owner for owner, _ in pending] + [owner for batch in in_flight.values() for owner, _ in batch]
+        try:
+            with metrics.current().phase("lookup_tables"):
+                await tables.ensure(recipients)
+            lookup_tables, lookup = tables.accounts, tables.lookup()
+            print(f"📇 {len(lookup)} recipients in {len(lookup_tables)} address lookup tables")
+        except Exception as e:
+            print(f"⚠️  Address lookup table update failed, sending legacy transactions: {e}")
+            logger.warning(f"Address lookup table update failed: {str(e)}", metadata={'run_id': run_id})
+
+    # Pack as many transfers as fit into each transaction
+    batches = pack_transfers(wallet.pubkey(), pending, compute_budget=PRIORITY_FEES, lookup=lookup)
+
+    print(f"\n📤 Sending rewards in {len(batches)} transactions ({PAYOUT_CONCURRENCY} in flight)...")
+    if in_flight:
+        print(f"   ↻ Tracking {len(in_flight)} transactions sent before the last interruption")
+
+    def record_sent(batch, signature, last_valid_block_height):
+        journal.mark_sent(run_id, batch, signature, last_valid_block_height)
+
+    budget = ComputeBudget(client) if PRIORITY_FEES else None
+    sender = PayoutSender(client, wallet, concurrency=PAYOUT_CONCURRENCY, before_send=record_sent,
+                          compute_budget=budget, lookup_tables=lookup_tables)
+
+    # Simulate the whole run up front, drop the recipients that would fail and send the rest unchecked
+    if BATCH_PREFLIGHT and batches:
+        from preflight import preflight_payouts
+
+        try:
+            with metrics.current().phase("preflight"):
+                preflight = await preflight_payouts(client, wallet, batches, sender.blockhashes, budget, lookup_tables)
+            preflight.print("payouts")
+            if preflight.wallet_error:
+                # Nothing to learn about the recipients; keep them all and let the node decide per send
+                raise RuntimeError(preflight.wallet_error)
+            for batch, error in preflight.rejected:
+                journal.mark_failed(run_id, batch, f"Simulation failed: {error}")
+                owner, _ = batch[0]
+                print(f"   ❌ Dropped {owner}: {error}")
+            batches = preflight.passed
+            sender.skip_preflight = True
+        except Exception as e:
+            print(f"⚠️  Batch simulation failed, sending with node preflight: {e}")
+            logger.warning(f"Batch simulation failed: {str(e)}", metadata={'run_id': run_id})
+
+    def on_confirmed(confirmation):
+        batch = confirmation.payload
+        lamports = sum(amount for _, amount in batch)
+        if confirmation.ok:
+            journal.mark_confirmed(run_id, batch, confirmation.signature)
+            print(f"   ✅ Confirmed {lamports / 1e9:.9f} SOL to {len(batch)} holders ({confirmation.signature})")
+            # Per-recipient rows go to the payouts table once the run is done
+            logger.success(f"Distributed {lamports / 1e9:.9f} SOL to {len(batch)} holders",
+                           sol_amount=lamports / 1e9, tx_signature=confirmation.signature,
+                           metadata={'recipients': len(batch), 'run_id': run_id})
+        else:
+            journal.mark_failed(run_id, batch, confirmation.error)
+            print(f"   ❌ Payout to {len(batch)} holders failed ({confirmation.signature}): {confirmation.error}")
+
+    tracker = ConfirmationTracker(client, sender.blockhashes, on_confirmed=on_confirmed, on_resend=record_sent)
+
+    for (signature, last_valid_block_height), batch in in_flight.items():
+        tracker.track(signature, last_valid_block_height,
+                      partial(build_transfer_tx, wallet, batch, lookup_tables=lookup_tables), payload=batch)
+    if in_flight:
+        # Sent long enough ago to be out of the node's status cache: settle the ones that landed
+        # from the ledger (poll_once searches history for expired signatures) before any re-send
+        try:
+            await tracker.poll_once()
+            print(f"   ↻ {len(tracker.results)} of them had already been processed")
+        except Exception as e:
+            print(f"⚠️  Could not check transactions sent before the interruption: {e}")
+
+    def on_result(result):
+        if result.ok:
+            print(f"   📨 Sent {result.lamports / 1e9:.9f} SOL to {len(result.recipients)} holders ({result.signature})")
+            tracker.track(result.signature, result.last_valid_block_height,
+                          partial(build_transfer_tx, wallet, result.recipients,
+                                  compute_budget=result.compute_budget, lookup_tables=lookup_tables),
+                          payload=result.recipients)
+        elif result.retryable:
+            journal.mark_pending(run_id, result.recipients, result.error)
+            print(f"   ↻ Could not send to {len(result.recipients)} holders, kept for a retry: {result.error}")
+        else:
+            journal.mark_failed(run_id, result.recipients, result.error)
+            owner, _ = result.recipients[0]
+            print(f"   ❌ Failed to send to {owner}: {result.error}")
+
+    # Confirming runs alongside the sends, so early batches are checked while the node still caches their status
+    with metrics.current().phase("send"):
+        sending = asyncio.ensure_future(sender.send_all(batches, on_result=on_result))
+        confirming = asyncio.ensure_future(tracker.wait(sending))
+        try:
+            await sending
+        except BaseException:
+            confirming.cancel()
+            raise
+    throughput = sender.throughput()
+
+    # Only confirmed transactions count as paid
+    print(f"\n⏳ Confirming {len(tracker.pending)} transactions...")
+    with metrics.current().phase("confirm"):
+        await confirming
+    resends = sum(c.resends for c in tracker.results)
+
+    # Batches that never went out stay pending, and the run is resumed by the next one
+    unsent = journal.pending(run_id)
+    if unsent:
+        print(f"\n⚠️  {len(unsent)} payouts could not be sent; run {run_id} will be resumed next time")
+        logger.warning(f"{len(unsent)} payouts left pending, run {run_id} will be resumed",
+                       metadata={'run_id': run_id, 'pending': len(unsent)})
+        return
+
+    journal.finish_run(run_id)
+    await record_payout_history(journal, wallet.pubkey(), run_id)
+    summary = journal.summary(run_id)
+    success_count, distributed_lamports = summary.get(CONFIRMED, (0, 0))
+    failed_count, _ = summary.get(FAILED, (0, 0))
+    total_count = sum(count for count, _ in summary.values())
+
+    print(f"\n✅ Distribution complete!")
+    print(f"   • Successful: {success_count}/{total_count}")
+    print(f"   • Throughput: {throughput['tx_per_sec']} tx/s, {throughput['payouts_per_sec']} payouts/s "
+          f"over {throughput['elapsed_sec']}s ({throughput['blockhash_fetches']} blockhash fetches)")
+    print(f"   • Confirmation: {tracker.polls} status polls, {resends} re-sends")
+    logger.info(f"Distribution completed: {success_count} successful, {failed_count} failed",
+               metadata={'run_id': run_id,
+                        'total_distributed': distributed_lamports / 1e9,
+                        'recipients': success_count,
+                        'transactions': len(batches),
+                        'resends': resends,
+                        'throughput': throughput})
+    if failed_count > 0:
+        print(f"   • Failed: {failed_count}")
+
+async def resume_unfinished_runs(client: AsyncClient, wallet: Keypair, journal: DistributionJournal):
+    """Finish payouts of runs interrupted by a crash, straight from the journaled allocation"""
+    for run_id in journal.unfinished_runs(wallet.pubkey()):
+        print("\n" + "=" * 60)
+        print(f"Resuming interrupted distribution run {run_id}")
+        print("=" * 60)
+        logger.warning(f"Resuming interrupted distribution run {run_id}", metadata={'run_id': run_id})
+        await execute_payouts(client, wallet, journal, run_id)
+
+    # Finished runs whose payout history never reached Supabase (crash or outage)
+    if logger.enabled:
+        for run_id in journal.unrecorded_runs(wallet.pubkey()):
+            await record_payout_history(journal, wallet.pubkey(), run_id)
+
+@contextmanager
+def run_lock():
+    """Non-blocking process lock so the daemon and the fallback timer never claim at the same time"""
+    with open(RUN_LOCK_PATH, 'w') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+async def run_pipeline(wallets: List[Keypair], client: Optional[AsyncClient] = None, dry_run: bool = False) -> float:
+    """Claim creator fees and distribute them, unless another run holds the lock.
+
+    The holder snapshot and each wallet's allocation are prepared while its claims are in
+    flight, so payouts start as soon as the claims confirm. With `dry_run` nothing is
+    sent: claims and payouts are simulated and their cost printed.
+    """
+    with run_lock() as acquired:
+        if not acquired:
+            print("⏭️  Another collector run is in progress, skipping")
+            return 0.0
+
+        run_metrics = metrics.start_run()
+        owns_client = client is None
+        if owns_client:
+            client = new_rpc_client()
+        journal = DistributionJournal()
+        prepared: Dict[Pubkey, asyncio.Task] = {}
+
+        def prefetch(claimable: Dict[Pubkey, float]):
+            # One holder snapshot shared by every wallet, allocated per wallet as soon as it lands
+            holders = asyncio.ensure_future(fetch_holders(client))
+            for wallet_pubkey, amount in claimable.items():
+                prepared[wallet_pubkey] = asyncio.ensure_future(prefetch_distribution(holders, amount))
+
+        try:
+            # Finish anything a previous crash left half-paid before claiming more
+            if dry_run:
+                unfinished = sum(len(journal.unfinished_runs(wallet.pubkey())) for wallet in wallets)
+                if unfinished:
+                    print(f"🧪 Dry run: {unfinished} interrupted distribution run(s) would be resumed first")
+            else:
+                with run_metrics.phase("resume"):
+                    for wallet in wallets:
+                        await resume_unfinished_runs(client, wallet, journal)
+
+            claimed = await collect_creator_fees(wallets, client=client, dry_run=dry_run, on_claimable=prefetch)
+
+            if not claimed:
+                logger.info("No fees to claim, skipping execution")
+
+            # Each creator wallet pays holders out of its own claimed fees
+            for wallet in wallets:
+                claimed_amount = claimed.get(wallet.pubkey(), 0.0)
+                if claimed_amount > 0:
+                    await distribute_rewards(wallet, claimed_amount, client=client, journal=journal, dry_run=dry_run,
+                                             prepared=prepared.get(wallet.pubkey()))
+
+            return sum(claimed.values())
+        finally:
+            # Snapshots of wallets whose claims all failed are never awaited
+            for task in prepared.values():
+                task.cancel()
+            await asyncio.gather(*prepared.values(), return_exceptions=True)
+            journal.close()
+            if owns_client:
+                # A one-off run also owns the signature websocket; the daemon keeps both open
+                from signature_subscriptions import close_shared
+
+                await client.close()
+                await close_shared()
+            report_run_metrics(run_metrics)
+            prune_logs()
+
+def report_run_metrics(run_metrics: metrics.RunMetrics):
+    """Print the run's phase timings and RPC usage, then export them"""
+    summary = run_metrics.summary()
+    phases = ", ".join(f"{name} {sec:.2f}s" for name, sec in summary['phases_sec'].items())
+    calls = ", ".join(f"{name} ×{c['count']} ({c['avg_ms']:.0f} ms avg)" for name, c in summary['calls'].items())
+    print(f"\n⏱️  Run took {summary['duration_sec']:.2f}s: {phases}")
+    print(f"   Calls: {calls or 'none'}")
+
+    logger.info(f"Run summary: {summary['duration_sec']:.2f}s", metadata={'metrics': summary})
+    run_metrics.write_textfile()
+
+async def run_daemon(wallets: List[Keypair]):
+    """Stay resident with warm clients and claim as soon as the AMM vault crosses MIN_CLAIM"""
+    from solana.rpc.websocket_api import connect
+    from solana.rpc.commitment import Confirmed
+    from solders.rpc.responses import AccountNotification
+    from rpc_pool import ws_url
+    from signature_subscriptions import close_shared
+
+    client = new_rpc_client()
+    coin_vaults = [vault.coin_vault for vault in plan_vaults(wallets, [WSOL_MINT])]
+    min_claim_units = int(MIN_CLAIM * 10 ** 9)  # WSOL has 9 decimals
+    running: Optional[asyncio.Task] = None
+
+    def trigger(reason: str):
+        nonlocal running
+        if running and not running.done():
+            return
+        print(f"\n⚡ {reason}")
+        logger.info(f"Daemon run triggered: {reason}")
+        running = asyncio.create_task(run_pipeline(wallets, client))
+
+    async def fallback_poll():
+        # Catch anything the subscription missed (e.g. while reconnecting)
+        while True:
+            trigger("Periodic fallback check")
+            await asyncio.sleep(DAEMON_POLL_INTERVAL)
+
+    poller = asyncio.create_task(fallback_poll())
+    logger.info(f"Daemon started, watching {len(coin_vaults)} AMM vault(s)")
+
+    try:
+        while True:
+            try:
+                async with connect(ws_url()) as websocket:
+                    for coin_vault in coin_vaults:
+                        await websocket.account_subscribe(coin_vault, commitment=Confirmed, encoding="base64")
+                        await websocket.recv()  # subscription confirmation
+                    print(f"👂 Subscribed to {len(coin_vaults)} AMM vault(s)")
+
+                    async for messages in websocket:
+                        for message in messages:
+                            if not isinstance(message, AccountNotification):
+                                continue
+
+                            account = message.result.value
+                            if account is None or len(account.data) < 72:
+                                continue
+
+                            # SPL token account amount: u64 at offset 64
+                            amount = int.from_bytes(bytes(account.data)[64:72], 'little')
+                            if amount >= min_claim_units:
+                                trigger(f"Vault balance {amount / 1e9:.9f} SOL crossed {MIN_CLAIM} SOL")
+            except Exception as e:
+                print(f"⚠️  Vault subscription dropped ({e}), reconnecting in {DAEMON_RECONNECT_DELAY}s")
+                await asyncio.sleep(DAEMON_RECONNECT_DELAY)
+    finally:
+        poller.cancel()
         await client.close()
+        await close_shared()
 
 async def main():
     logger.info("Fee collector started")
@@ -544,13 +850,15 @@ async def main():
     print()
 
     try:
-        wallet = load_wallet()
-        claimed_amount = await collect_creator_fees(wallet)
+        wallets = load_wallets()
+        mark("wallets loaded")
 
-        if claimed_amount > 0:
-            await distribute_rewards(wallet, claimed_amount)
+        if "--dry-run" in sys.argv:
+            await run_pipeline(wallets, dry_run=True)
+        elif "--daemon" in sys.argv:
+            await run_daemon(wallets)
         else:
-            logger.info("No fees to claim, skipping execution")
+            await run_pipeline(wallets)
 
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
@@ -566,7 +874,9 @@ async def main():
 
     print()
     print("=" * 60)
-    logger.info("Fee collector completed")
+    if STARTUP_TIMING or "--profile-startup" in sys.argv:
+        print_report()
+    logger.info("Fee collector completed", metadata={'startup_timing': report()})
 
 if __name__ == "__main__":
     asyncio.run(main())
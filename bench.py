@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Offline benchmark: holder fetch/parse, allocation and full distribution against a local RPC stand-in"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+# Must be set before the collector modules read their configuration
+os.environ["SUPABASE_URL"] = ""  # never log benchmark runs to the real database
+os.environ.setdefault("CONFIRM_POLL_INTERVAL", "0.05")
+os.environ.setdefault("CONFIRM_WEBSOCKET", "0")  # the local RPC stand-in has no websocket
+os.environ.setdefault("HOLDER_FETCH_MODE", "full")
+
+import base58
+import numpy as np
+from solders.pubkey import Pubkey
+from solders.keypair import Keypair
+from solders.hash import Hash
+from solders.transaction import Transaction as SoldersTransaction, VersionedTransaction
+from solders.transaction_status import TransactionStatus, TransactionConfirmationStatus
+
+from atomid import ACCOUNT_DTYPE, ATOMID_ACCOUNT_SIZE, get_atomid_holders, get_sliced_holders
+from allocation import allocate_lamports
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+class _Account:
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+class _KeyedAccount:
+    __slots__ = ("pubkey", "account")
+
+    def __init__(self, pubkey: Pubkey, data: bytes):
+        self.pubkey = pubkey
+        self.account = _Account(data)
+
+class _Blockhash:
+    def __init__(self, blockhash: Hash, last_valid_block_height: int):
+        self.blockhash = blockhash
+        self.last_valid_block_height = last_valid_block_height
+
+def synthetic_accounts(n: int, seed: int = 1) -> np.ndarray:
+    """n AtomID accounts in the on-chain 270-byte layout, as one (n, 270) uint8 array"""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(n, dtype=ACCOUNT_DTYPE)
+    records['owner'] = rng.integers(0, 256, size=(n, 32), dtype=np.uint8)
+    # Burns are heavy-tailed: most holders burned a little, a few burned a lot (6 decimals)
+    records['total_burned'] = (rng.lognormal(mean=7, sigma=1.5, size=n) * 1e6).astype(np.uint64) + 1
+    records['rank'] = rng.integers(0, 10, size=n, dtype=np.uint8)
+    records['created_at_slot'] = rng.integers(1, 300_000_000, size=n, dtype=np.uint64)
+    records['updated_at_slot'] = records['created_at_slot']
+    return records.view(np.uint8).reshape(n, ATOMID_ACCOUNT_SIZE)
+
+class FakeRpc:
+    """In-process stand-in for AsyncClient serving synthetic AtomID accounts.
+
+    Every sent transaction lands after `latency` seconds and reports as confirmed.
+    """
+
+    def __init__(self, accounts: np.ndarray, latency: float = 0.005):
+        self.accounts = accounts
+        self.addresses = [Pubkey(bytes(row)) for row in np.random.default_rng(2).integers(
+            0, 256, size=(len(accounts), 32), dtype=np.uint8)]
+        self.latency = latency
+        self.block_height = 1_000
+        self.landed = set()
+        self.send_times = []
+        self.calls = {}
+        self._rows = None
+
+    def _count(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    async def get_program_accounts(self, program_id, commitment=None, encoding=None, data_slice=None, filters=None):
+        self._count("getProgramAccounts")
+        mask = np.ones(len(self.accounts), dtype=bool)
+        for f in filters or []:
+            if isinstance(f, int):
+                mask &= self.accounts.shape[1] == f
+            else:
+                prefix = np.frombuffer(base58.b58decode(f.bytes), dtype=np.uint8)
+                mask &= (self.accounts[:, f.offset:f.offset + len(prefix)] == prefix).all(axis=1)
+
+        rows = np.flatnonzero(mask)
+        columns = self.accounts
+        if data_slice:
+            columns = self.accounts[:, data_slice.offset:data_slice.offset + data_slice.length]
+        await asyncio.sleep(self.latency)
+        return _Value([_KeyedAccount(self.addresses[i], columns[i].tobytes()) for i in rows])
+
+    async def get_multiple_accounts(self, pubkeys, commitment=None, encoding=None, data_slice=None):
+        self._count("getMultipleAccounts")
+        if self._rows is None:
+            self._rows = {address: i for i, address in enumerate(self.addresses)}
+        await asyncio.sleep(self.latency)
+        return _Value([_Account(self.accounts[self._rows[p]].tobytes()) if p in self._rows else None
+                       for p in pubkeys])
+
+    async def get_latest_blockhash(self, commitment=None):
+        self._count("getLatestBlockhash")
+        return _Value(_Blockhash(Hash.new_unique(), self.block_height + 150))
+
+    async def send_raw_transaction(self, raw: bytes, opts=None):
+        self._count("sendTransaction")
+        try:
+            signature = SoldersTransaction.from_bytes(raw).signatures[0]
+        except Exception:
+            signature = VersionedTransaction.from_bytes(raw).signatures[0]
+        await asyncio.sleep(self.latency)
+        self.landed.add(signature)
+        self.send_times.append(time.perf_counter())
+        return _Value(signature)
+
+    async def get_block_height(self, commitment=None):
+        return _Value(self.block_height)
+
+    async def get_signature_statuses(self, signatures, search_transaction_history=False):
+        self._count("getSignatureStatuses")
+        confirmed = TransactionStatus(1, None, None, None, TransactionConfirmationStatus.Confirmed)
+        return _Value([confirmed if s in self.landed else None for s in signatures])
+
+    async def close(self):
+        pass
+
+def _mib(n: int) -> float:
+    return round(n / (1 << 20), 1)
+
+async def measure(fn, trace: bool):
+    """Run `fn` once timed, then (optionally) again under tracemalloc for its peak memory"""
+    started = time.perf_counter()
+    result = await fn()
+    elapsed = time.perf_counter() - started
+
+    peak = None
+    if trace:
+        tracemalloc.start()
+        await fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+async def bench_size(n: int, latency: float, trace: bool, claim_sol: float) -> dict:
+    from journal import DistributionJournal
+    import automain
+
+    accounts = synthetic_accounts(n)
+    client = FakeRpc(accounts, latency=latency)
+    row = {'holders': n}
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        holders, elapsed, peak = await measure(lambda: get_atomid_holders(client), trace)
+    row['parse_sec'] = round(elapsed, 4)
+    row['parse_peak_mib'] = _mib(peak) if peak is not None else None
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        _, elapsed, peak = await measure(lambda: get_sliced_holders(client), trace)
+    row['sliced_parse_sec'] = round(elapsed, 4)
+    row['sliced_parse_peak_mib'] = _mib(peak) if peak is not None else None
+
+    async def allocate():
+        return allocate_lamports(holders.total_burned, int(claim_sol * 1e9))
+    _, elapsed, peak = await measure(allocate, trace)
+    row['allocation_sec'] = round(elapsed, 4)
+    row['allocation_peak_mib'] = _mib(peak) if peak is not None else None
+
+    wallet = Keypair()
+    with tempfile.TemporaryDirectory() as tmp:
+        send_windows = []
+
+        async def distribute():
+            client.send_times = []
+            # Each pass starts from an empty journal, like a first run
+            journal = DistributionJournal(os.path.join(tmp, f"journal-{len(send_windows)}.sqlite3"))
+            try:
+                with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    await automain.distribute_rewards(wallet, claim_sol, client=client, journal=journal)
+                send_windows.append(client.send_times)
+                return journal.db.execute("SELECT COUNT(*) FROM payouts WHERE state = 'confirmed'").fetchone()[0]
+            finally:
+                journal.close()
+
+        paid, elapsed, peak = await measure(distribute, trace)
+
+    # Send throughput over the window in which the timed pass was actually sending
+    times = send_windows[0]
+    row['distribute_sec'] = round(elapsed, 4)
+    row['distribute_peak_mib'] = _mib(peak) if peak is not None else None
+    row['payouts'] = paid
+    row['transactions'] = len(times)
+    window = (times[-1] - times[0]) if len(times) > 1 else 0.0
+    row['tx_per_sec'] = round((len(times) - 1) / window, 1) if window > 0 else None
+    return row
+
+def print_table(rows):
+    columns = [
+        ('holders', 'holders'),
+        ('parse_sec', 'parse s'),
+        ('sliced_parse_sec', 'sliced s'),
+        ('allocation_sec', 'alloc s'),
+        ('distribute_sec', 'distribute s'),
+        ('transactions', 'txs'),
+        ('tx_per_sec', 'tx/s'),
+        ('parse_peak_mib', 'parse MiB'),
+        ('allocation_peak_mib', 'alloc MiB'),
+        ('distribute_peak_mib', 'distrib MiB'),
+    ]
+    print("  ".join(f"{label:>12}" for _, label in columns))
+    for row in rows:
+        print("  ".join(f"{'-' if row.get(key) is None else row[key]:>12}" for key, _ in columns))
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SIZES,
+                        help="comma-separated holder counts (default: 1000,10000,100000,1000000)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated RPC round trip per call")
+    parser.add_argument("--claim-sol", type=float, default=None,
+                        help="SOL claimed per run (default: 0.01 SOL per holder)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass (halves run time)")
+    parser.add_argument("--json", metavar="PATH", help="append results as JSON lines for run-to-run comparison")
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.sizes:
+        print(f"⏱️  Benchmarking {n:,} holders...", file=sys.stderr)
+        claim_sol = args.claim_sol if args.claim_sol is not None else n * 0.01
+        rows.append(await bench_size(n, args.latency_ms / 1000, not args.no_memory, claim_sol))
+
+    print_table(rows)
+
+    if args.json:
+        stamp = datetime.now(timezone.utc).isoformat()
+        with open(args.json, 'a') as f:
+            for row in rows:
+                f.write(json.dumps({'timestamp': stamp, 'latency_ms': args.latency_ms, **row}) + "\n")
+        print(f"\n📄 Results appended to {args.json}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
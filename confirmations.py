@@ -0,0 +1,204 @@
+import os
+import asyncio
+from solders.hash import Hash
+from solders.signature import Signature
+from solders.transaction import Transaction as SoldersTransaction
+from solders.transaction_status import TransactionConfirmationStatus
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from solana.rpc.core import RPCException
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from payouts import BlockhashCache
+from signature_subscriptions import SignatureSubscriber, shared
+
+# getSignatureStatuses accepts at most 256 signatures per request
+SIGNATURE_STATUS_LIMIT = 256
+CONFIRM_POLL_INTERVAL = float(os.getenv("CONFIRM_POLL_INTERVAL", "2.0"))
+# While the signature websocket is up, statuses are only polled this often, to catch
+# expired blockhashes and any notification the socket missed
+CONFIRM_WS_POLL_INTERVAL = float(os.getenv("CONFIRM_WS_POLL_INTERVAL", "15"))
+MAX_RESENDS = 3
+
+CONFIRMED_STATUSES = (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized)
+
+@dataclass
+class Confirmation:
+    """Final state of one tracked transaction"""
+    payload: Any
+    signature: str
+    error: Optional[str] = None
+    resends: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class _Pending:
+    payload: Any
+    signature: Signature
+    last_valid_block_height: int
+    rebuild: Callable[[Hash], SoldersTransaction]
+    resends: int = 0
+
+class ConfirmationTracker:
+    """Confirms sent transactions in bulk and re-sends the ones whose blockhash expired unseen.
+
+    A transaction is only re-signed once the block height has passed its blockhash's
+    last valid height and the ledger has no record of it, so the original can no longer
+    land and nothing is paid twice.
+    Confirmations arrive over the shared signature websocket when it is up; batched
+    status polling covers the rest.
+    """
+
+    def __init__(self, client: AsyncClient, blockhashes: BlockhashCache,
+                 poll_interval: float = CONFIRM_POLL_INTERVAL, max_resends: int = MAX_RESENDS,
+                 on_confirmed: Optional[Callable[[Confirmation], None]] = None,
+                 on_resend: Optional[Callable[[Any, str, int], None]] = None,
+                 subscriber: Optional[SignatureSubscriber] = None,
+                 ws_poll_interval: float = CONFIRM_WS_POLL_INTERVAL):
+        self.client = client
+        self.blockhashes = blockhashes
+        self.poll_interval = poll_interval
+        self.max_resends = max_resends
+        self.on_confirmed = on_confirmed
+        self.on_resend = on_resend
+        self.subscriber = subscriber if subscriber is not None else shared()
+        self.ws_poll_interval = ws_poll_interval
+        self.pending: Dict[Signature, _Pending] = {}
+        self.results: List[Confirmation] = []
+        self.polls = 0
+        self._notified: List[Tuple[Signature, Optional[str]]] = []
+        self._wakeup = asyncio.Event()
+
+    def track(self, signature: str, last_valid_block_height: int,
+              rebuild: Callable[[Hash], SoldersTransaction], payload: Any = None):
+        sig = Signature.from_string(signature)
+        self.pending[sig] = _Pending(payload, sig, last_valid_block_height, rebuild)
+        self._watch(sig)
+
+    def _watch(self, sig: Signature):
+        if self.subscriber is not None:
+            self.subscriber.subscribe(sig).add_done_callback(partial(self._on_notification, sig))
+
+    def _on_notification(self, sig: Signature, future: asyncio.Future):
+        if not future.cancelled():
+            self._notified.append((sig, future.result()))
+            self._wakeup.set()
+
+    def _apply_notifications(self):
+        notified, self._notified = self._notified, []
+        for sig, error in notified:
+            entry = self.pending.get(sig)
+            if entry is not None:
+                self._finish(entry, error)
+
+    def _finish(self, entry: _Pending, error: Optional[str] = None):
+        del self.pending[entry.signature]
+        if self.subscriber is not None:
+            self.subscriber.forget(entry.signature)
+        confirmation = Confirmation(entry.payload, str(entry.signature), error, entry.resends)
+        self.results.append(confirmation)
+        if self.on_confirmed:
+            self.on_confirmed(confirmation)
+
+    async def _statuses(self, signatures: List[Signature], search_transaction_history: bool = False) -> Dict[Signature, Any]:
+        chunks = [signatures[i:i + SIGNATURE_STATUS_LIMIT] for i in range(0, len(signatures), SIGNATURE_STATUS_LIMIT)]
+        responses = await asyncio.gather(*(self.client.get_signature_statuses(
+            chunk, search_transaction_history=search_transaction_history) for chunk in chunks))
+        return {sig: status for chunk, response in zip(chunks, responses) for sig, status in zip(chunk, response.value)}
+
+    async def _resend(self, entry: _Pending):
+        try:
+            blockhash, last_valid_block_height = await self.blockhashes.latest()
+            tx = entry.rebuild(blockhash)
+        except Exception as e:
+            self._finish(entry, f"Re-send failed: {e}")
+            return
+
+        if self.on_resend:
+            self.on_resend(entry.payload, str(tx.signatures[0]), last_valid_block_height)
+
+        try:
+            await self.client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=False))
+        except RPCException as e:
+            self._finish(entry, f"Re-send rejected: {e}")
+            return
+        except Exception:
+            pass  # May still have been forwarded, keep tracking the new signature
+
+        del self.pending[entry.signature]
+        if self.subscriber is not None:
+            self.subscriber.forget(entry.signature)
+        entry.signature = tx.signatures[0]
+        entry.last_valid_block_height = last_valid_block_height
+        entry.resends += 1
+        self.pending[entry.signature] = entry
+        self._watch(entry.signature)
+
+    async def poll_once(self):
+        """Check every pending signature once, finishing or re-sending as needed"""
+        self.polls += 1
+        # Statuses and block height must come from the same node (RpcPool.pinned) to be compared.
+        # The height is read first: a signature still unknown afterwards was unknown at a
+        # height past its last valid one, so it can no longer land
+        with getattr(self.client, "pinned", nullcontext)():
+            block_height = (await self.client.get_block_height()).value
+            statuses = await self._statuses(list(self.pending))
+
+            # The recent status cache only covers the last ~300 slots, so an expired signature
+            # that landed earlier also reads as unknown; only the ledger tells it from a dropped one
+            expired = [sig for sig, status in statuses.items()
+                       if status is None and block_height > self.pending[sig].last_valid_block_height]
+            if expired:
+                statuses.update(await self._statuses(expired, search_transaction_history=True))
+
+        for sig, status in statuses.items():
+            entry = self.pending.get(sig)
+            if entry is None:
+                continue
+
+            if status is not None and status.err is not None:
+                self._finish(entry, str(status.err))
+            elif status is not None and status.confirmation_status in CONFIRMED_STATUSES:
+                self._finish(entry)
+            elif status is None and block_height > entry.last_valid_block_height:
+                # Dropped: its blockhash expired before it landed
+                if entry.resends >= self.max_resends:
+                    self._finish(entry, f"Expired after {entry.resends} re-sends")
+                else:
+                    await self._resend(entry)
+
+    async def wait(self, sending: Optional[asyncio.Future] = None) -> List[Confirmation]:
+        """Wait until every tracked transaction is confirmed or failed.
+
+        Websocket notifications finish transactions as they arrive. Statuses are polled
+        every `poll_interval` while the socket is down, otherwise every `ws_poll_interval`.
+        With `sending`, confirming starts while transactions are still being sent and
+        tracked, and lasts until that future is done too.
+        """
+        if sending is not None:
+            sending.add_done_callback(lambda _: self._wakeup.set())
+
+        loop = asyncio.get_running_loop()
+        last_poll = loop.time()
+        while self.pending or (sending is not None and not sending.done()):
+            if not self._notified:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._apply_notifications()
+
+            live = self.subscriber is not None and self.subscriber.connected.is_set()
+            if self.pending and (not live or loop.time() - last_poll >= self.ws_poll_interval):
+                last_poll = loop.time()
+                try:
+                    await self.poll_once()
+                except Exception as e:
+                    print(f"⚠️  Signature status poll failed: {e}")
+        return self.results
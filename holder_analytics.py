@@ -0,0 +1,133 @@
+import numpy as np
+from solders.pubkey import Pubkey
+from typing import Dict, Iterator, Optional, Sequence
+from atomid import HolderTable
+
+RANK_TITLES = {
+    0: "Initiate",
+    1: "Believer",
+    2: "Devotee",
+    3: "Guardian",
+    4: "Keeper",
+    5: "Oracle",
+    6: "Architect",
+    7: "Sage",
+    8: "Ascended",
+    9: "Eternal"
+}
+
+DEFAULT_PERCENTILES = (50, 75, 90, 99, 99.9)
+
+# Rows formatted per chunk while exporting, so memory stays flat for any holder count
+EXPORT_CHUNK = 50_000
+
+EXPORT_COLUMNS = ["position", "wallet", "rank", "rank_title", "burned_atom", "share_pct",
+                  "created_at_slot", "updated_at_slot"]
+
+# total_burned is stored with 6 decimals
+ATOM_DECIMALS = 1e6
+
+def rank_title(rank: int) -> str:
+    return RANK_TITLES.get(rank, f"Rank {rank}")
+
+def top_holders(holders: HolderTable, n: Optional[int] = None) -> np.ndarray:
+    """Indices of the `n` largest burners, largest first (all holders when n is None).
+
+    Holders with equal burns keep their index order. Only the top n are sorted; the
+    cut-off value is found with a linear-time partition.
+    """
+    burned = holders.total_burned
+    # total_burned is unsigned, so ~burned sorts descending without overflow
+    if n is None or n >= len(burned):
+        return np.argsort(~burned, kind='stable')
+    if n <= 0:
+        return np.zeros(0, dtype=np.intp)
+
+    cutoff = np.partition(burned, len(burned) - n)[len(burned) - n]
+    above = np.flatnonzero(burned > cutoff)
+    candidates = np.concatenate((above, np.flatnonzero(burned == cutoff)[:n - len(above)]))
+    return candidates[np.argsort(~burned[candidates], kind='stable')]
+
+def burn_percentiles(holders: HolderTable, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+    """ATOM burned at each percentile of holders"""
+    if len(holders) == 0:
+        return {}
+    values = np.percentile(holders.total_burned.astype(np.float64), percentiles) / ATOM_DECIMALS
+    return dict(zip(percentiles, values.tolist()))
+
+def rank_histogram(holders: HolderTable) -> Dict[int, int]:
+    """Holder count per rank, in rank order, in one bincount pass"""
+    counts = np.bincount(holders.rank, minlength=len(RANK_TITLES))
+    return {rank: int(count) for rank, count in enumerate(counts.tolist()) if count}
+
+def summarize(holders: HolderTable, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+    total_burned = int(holders.total_burned.sum(dtype=object))
+    return {
+        'holders': len(holders),
+        'total_burned_atom': total_burned / ATOM_DECIMALS,
+        'average_burned_atom': total_burned / len(holders) / ATOM_DECIMALS if len(holders) else 0.0,
+        'percentiles_atom': burn_percentiles(holders, percentiles),
+        'ranks': {rank_title(rank): count for rank, count in rank_histogram(holders).items()},
+    }
+
+def iter_chunks(holders: HolderTable, order: np.ndarray, chunk: int = EXPORT_CHUNK) -> Iterator[Dict[str, list]]:
+    """Leaderboard columns (EXPORT_COLUMNS) in `order`, one dict of column lists per chunk.
+
+    Numeric columns are computed per chunk with numpy; only wallet encoding is per row.
+    """
+    total = float(holders.total_burned.sum(dtype=np.float64)) or 1.0
+    for start in range(0, len(order), chunk):
+        idx = order[start:start + chunk]
+        burned = holders.total_burned[idx]
+        ranks = holders.rank[idx].tolist()
+        yield {
+            'position': list(range(start + 1, start + len(idx) + 1)),
+            'wallet': [str(Pubkey(owner.tobytes())) for owner in holders.owners[idx]],
+            'rank': ranks,
+            'rank_title': [rank_title(rank) for rank in ranks],
+            'burned_atom': (burned / ATOM_DECIMALS).tolist(),
+            'share_pct': (burned.astype(np.float64) * (100 / total)).tolist(),
+            'created_at_slot': holders.created_at_slot[idx].tolist(),
+            'updated_at_slot': holders.updated_at_slot[idx].tolist(),
+        }
+
+# Every exported value is a number, a base58 wallet or a rank title, none of which need
+# CSV quoting or JSON escaping, so rows are formatted directly instead of via csv/json
+CSV_ROW = "{},{},{},{},{},{},{},{}\n"
+JSONL_ROW = ('{{"position": {}, "wallet": "{}", "rank": {}, "rank_title": "{}", "burned_atom": {}, '
+             '"share_pct": {}, "created_at_slot": {}, "updated_at_slot": {}}}\n')
+
+def _export_text(holders: HolderTable, path: str, order: Optional[np.ndarray], row: str, header: str = "") -> int:
+    order = top_holders(holders) if order is None else order
+    with open(path, 'w') as f:
+        f.write(header)
+        for columns in iter_chunks(holders, order):
+            f.write("".join(map(row.format, *columns.values())))
+    return len(order)
+
+def export_csv(holders: HolderTable, path: str, order: Optional[np.ndarray] = None) -> int:
+    return _export_text(holders, path, order, CSV_ROW, ",".join(EXPORT_COLUMNS) + "\n")
+
+def export_jsonl(holders: HolderTable, path: str, order: Optional[np.ndarray] = None) -> int:
+    return _export_text(holders, path, order, JSONL_ROW)
+
+def export_parquet(holders: HolderTable, path: str, order: Optional[np.ndarray] = None) -> int:
+    """Parquet export, one row group per chunk (needs `pip install pyarrow`)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    order = top_holders(holders) if order is None else order
+    schema = pa.schema([
+        ("position", pa.int64()), ("wallet", pa.string()), ("rank", pa.uint8()), ("rank_title", pa.string()),
+        ("burned_atom", pa.float64()), ("share_pct", pa.float64()),
+        ("created_at_slot", pa.uint64()), ("updated_at_slot", pa.uint64()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        for columns in iter_chunks(holders, order):
+            writer.write_table(pa.table(columns, schema=schema))
+    return len(order)
+
+EXPORTERS = {'csv': export_csv, 'jsonl': export_jsonl, 'parquet': export_parquet}
@@ -0,0 +1,144 @@
+import os
+import asyncio
+import sqlite3
+from solders.pubkey import Pubkey
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import DataSliceOpts
+from typing import Dict, List, Tuple
+from atomid import (ATOMID_PROGRAM_ID, ATOMID_ACCOUNT_SIZE, HolderTable,
+                    account_bytes, decode_accounts, get_atomid_holders, get_sliced_holders)
+
+HOLDER_INDEX_PATH = os.getenv("HOLDER_INDEX_PATH", "holder_index.sqlite3")
+
+# How holders are fetched: "index" (incremental local index), "sliced" (sharded 41-byte dataSlice) or "full"
+HOLDER_FETCH_MODE = os.getenv("HOLDER_FETCH_MODE", "index")
+HOLDER_FETCH_SHARD_BYTES = int(os.getenv("HOLDER_FETCH_SHARD_BYTES", "1"))
+HOLDER_FETCH_CONCURRENCY = int(os.getenv("HOLDER_FETCH_CONCURRENCY", "16"))
+
+# Offset of updated_at_slot: discriminator + owner + total_burned + rank + metadata + created_at_slot
+UPDATED_AT_SLOT_OFFSET = 8 + 32 + 8 + 1 + 204 + 8
+
+# getMultipleAccounts accepts at most 100 keys per request
+MULTIPLE_ACCOUNTS_LIMIT = 100
+FETCH_CONCURRENCY = 8
+
+# Above this share of changed accounts a single full getProgramAccounts is cheaper
+FULL_REFRESH_RATIO = 0.5
+
+def _slot(data: bytes) -> int:
+    return int.from_bytes(data[UPDATED_AT_SLOT_OFFSET:UPDATED_AT_SLOT_OFFSET + 8], 'little')
+
+class HolderIndex:
+    """Persistent snapshot of every AtomID account body, keyed by account address"""
+
+    def __init__(self, path: str = HOLDER_INDEX_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS atomid_accounts (
+                address BLOB PRIMARY KEY,
+                updated_at_slot INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def slots(self) -> Dict[bytes, int]:
+        return dict(self.db.execute("SELECT address, updated_at_slot FROM atomid_accounts"))
+
+    def apply(self, upserts: List[Tuple[bytes, bytes]], removed: List[bytes]):
+        """Store changed account bodies and drop closed accounts in one transaction"""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO atomid_accounts (address, updated_at_slot, data) VALUES (?, ?, ?)",
+                ((address, _slot(data), data) for address, data in upserts)
+            )
+            self.db.executemany("DELETE FROM atomid_accounts WHERE address = ?", ((a,) for a in removed))
+
+    def load(self) -> HolderTable:
+        return decode_accounts(data for (data,) in self.db.execute("SELECT data FROM atomid_accounts"))
+
+    def close(self):
+        self.db.close()
+
+async def _fetch_bodies(client: AsyncClient, addresses: List[bytes]) -> List[Tuple[bytes, bytes]]:
+    """Fetch full account bodies for the given addresses with concurrent getMultipleAccounts calls"""
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(chunk):
+        async with semaphore:
+            response = await client.get_multiple_accounts(
+                [Pubkey(address) for address in chunk], commitment=Confirmed, encoding="base64"
+            )
+        return [(address, account_bytes(account.data))
+                for address, account in zip(chunk, response.value) if account is not None]
+
+    chunks = [addresses[i:i + MULTIPLE_ACCOUNTS_LIMIT] for i in range(0, len(addresses), MULTIPLE_ACCOUNTS_LIMIT)]
+    results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+    return [row for rows in results for row in rows]
+
+async def sync_holder_index(client: AsyncClient, index: HolderIndex) -> Tuple[int, int]:
+    """Bring the index up to date, re-fetching only accounts whose updated_at_slot changed.
+
+    Returns (changed, removed) account counts.
+    """
+    # List every account but download only its 8-byte updated_at_slot
+    response = await client.get_program_accounts(
+        ATOMID_PROGRAM_ID,
+        commitment=Confirmed,
+        encoding="base64",
+        data_slice=DataSliceOpts(offset=UPDATED_AT_SLOT_OFFSET, length=8),
+        filters=[ATOMID_ACCOUNT_SIZE]
+    )
+
+    current = {
+        bytes(account.pubkey): int.from_bytes(account_bytes(account.account.data), 'little')
+        for account in response.value
+    }
+    known = index.slots()
+
+    changed = [address for address, slot in current.items() if known.get(address) != slot]
+    removed = [address for address in known if address not in current]
+
+    if len(changed) > FULL_REFRESH_RATIO * max(len(current), 1):
+        full = await client.get_program_accounts(
+            ATOMID_PROGRAM_ID,
+            commitment=Confirmed,
+            encoding="base64",
+            filters=[ATOMID_ACCOUNT_SIZE]
+        )
+        upserts = [(bytes(account.pubkey), account_bytes(account.account.data)) for account in full.value]
+    else:
+        upserts = await _fetch_bodies(client, changed)
+
+    index.apply(upserts, removed)
+    return len(changed), len(removed)
+
+async def get_indexed_holders(client: AsyncClient, path: str = HOLDER_INDEX_PATH) -> HolderTable:
+    """Get all AtomID holders through the local index, falling back to a full fetch"""
+    print(f"\n🔍 Syncing AtomID holder index {path} from program {ATOMID_PROGRAM_ID}...")
+
+    try:
+        index = HolderIndex(path)
+        try:
+            changed, removed = await sync_holder_index(client, index)
+            holders = index.load()
+        finally:
+            index.close()
+
+        print(f"📊 Index updated: {changed} changed, {removed} removed accounts")
+        print(f"✅ Found {len(holders)} AtomID holders")
+        return holders
+
+    except Exception as e:
+        print(f"⚠️  Holder index unavailable ({e}), fetching all accounts")
+        return await get_atomid_holders(client)
+
+async def load_holders(client: AsyncClient, mode: str = HOLDER_FETCH_MODE) -> HolderTable:
+    """Get all AtomID holders using the configured fetch mode"""
+    if mode == "sliced":
+        return await get_sliced_holders(client, shard_bytes=HOLDER_FETCH_SHARD_BYTES,
+                                        concurrency=HOLDER_FETCH_CONCURRENCY)
+    if mode == "full":
+        return await get_atomid_holders(client)
+    return await get_indexed_holders(client)
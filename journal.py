@@ -0,0 +1,273 @@
+import os
+import sqlite3
+from solders.pubkey import Pubkey
+from typing import Dict, List, Optional, Tuple, Union
+
+DISTRIBUTION_JOURNAL_PATH = os.getenv("DISTRIBUTION_JOURNAL_PATH", "distribution_journal.sqlite3")
+
+# Payout states:
+# - pending: allocated, never sent (or safe to send again)
+# - sent: signed with `signature`, may still land until `last_valid_block_height`
+# - confirmed / failed: final
+PENDING, SENT, CONFIRMED, FAILED = 'pending', 'sent', 'confirmed', 'failed'
+
+class DistributionJournal:
+    """Write-ahead record of each distribution run so a crashed run can resume without double-paying.
+
+    Every signature is recorded before its transaction is sent. On restart, `sent`
+    payouts are confirmed or re-sent only after their blockhash expired, and `pending`
+    payouts are sent from the stored allocation without re-fetching holders.
+
+    The `accruals` table carries each holder's unpaid rewards forward between runs
+    until they reach the payout threshold, per creator wallet: a wallet only ever pays
+    out rewards accrued from its own claims.
+    """
+
+    def __init__(self, path: str = DISTRIBUTION_JOURNAL_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                wallet TEXT NOT NULL,
+                claimed_lamports INTEGER NOT NULL,
+                distributable_lamports INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'distributing',
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                completed_at TEXT,
+                history_recorded INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS payouts (
+                run_id INTEGER NOT NULL REFERENCES runs (id),
+                recipient BLOB NOT NULL,
+                lamports INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                signature TEXT,
+                last_valid_block_height INTEGER,
+                error TEXT,
+                PRIMARY KEY (run_id, recipient)
+            );
+            CREATE INDEX IF NOT EXISTS payouts_state_idx ON payouts (run_id, state);
+            CREATE TABLE IF NOT EXISTS accruals (
+                wallet TEXT NOT NULL,
+                recipient BLOB NOT NULL,
+                lamports INTEGER NOT NULL,
+                PRIMARY KEY (wallet, recipient)
+            );
+            CREATE TABLE IF NOT EXISTS lookup_tables (
+                address TEXT PRIMARY KEY,
+                authority TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        # Journals created before payout history was uploaded: their runs are uploaded once
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(runs)")}
+        if 'history_recorded' not in columns:
+            self.db.execute("ALTER TABLE runs ADD COLUMN history_recorded INTEGER NOT NULL DEFAULT 0")
+        # Journals whose ledger predates per-wallet balances: every balance is assigned to
+        # the wallet of the latest run, or left unassigned ('') for the next wallet's run
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(accruals)")}
+        if 'wallet' not in columns:
+            self.db.executescript("""
+                ALTER TABLE accruals RENAME TO accruals_unkeyed;
+                CREATE TABLE accruals (
+                    wallet TEXT NOT NULL,
+                    recipient BLOB NOT NULL,
+                    lamports INTEGER NOT NULL,
+                    PRIMARY KEY (wallet, recipient)
+                );
+                INSERT INTO accruals (wallet, recipient, lamports)
+                SELECT COALESCE((SELECT wallet FROM runs ORDER BY id DESC LIMIT 1), ''), recipient, lamports
+                FROM accruals_unkeyed ORDER BY rowid;
+                DROP TABLE accruals_unkeyed;
+            """)
+        self.db.commit()
+
+    def start_run(self, wallet: Pubkey, claimed_lamports: int, distributable_lamports: int,
+                  shares: List[Tuple[Pubkey, int]], payout_threshold: int = 0) -> Optional[int]:
+        """Credit this run's shares to the accrual ledger and move every balance that reached
+        `payout_threshold` into a new run, all in one transaction.
+
+        Returns the run id, or None when no holder is due a payout yet.
+        """
+        with self.db:
+            # Unassigned balances from a pre-wallet ledger join the first wallet that runs
+            unassigned = dict(self.db.execute("SELECT recipient, lamports FROM accruals WHERE wallet = ''"))
+            if unassigned:
+                self.db.execute("DELETE FROM accruals WHERE wallet = ''")
+                self._credit(wallet, unassigned)
+            self._credit(wallet, self._merge(shares))
+
+            due = self.db.execute(
+                "SELECT recipient, lamports FROM accruals WHERE wallet = ? AND lamports >= ? AND lamports > 0 "
+                "ORDER BY rowid",
+                (str(wallet), payout_threshold)
+            ).fetchall()
+            if not due:
+                return None
+
+            cursor = self.db.execute(
+                "INSERT INTO runs (wallet, claimed_lamports, distributable_lamports) VALUES (?, ?, ?)",
+                (str(wallet), claimed_lamports, distributable_lamports)
+            )
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO payouts (run_id, recipient, lamports) VALUES (?, ?, ?)",
+                ((run_id, recipient, lamports) for recipient, lamports in due)
+            )
+            self.db.executemany(
+                "DELETE FROM accruals WHERE wallet = ? AND recipient = ?",
+                ((str(wallet), recipient) for recipient, _ in due)
+            )
+        return run_id
+
+    def preview_run(self, wallet: Pubkey, shares: List[Tuple[Pubkey, int]],
+                    payout_threshold: int = 0) -> List[Tuple[Pubkey, int]]:
+        """Payouts start_run() would create for these shares, without writing anything"""
+        # A recipient can have both a balance for this wallet and an unassigned one; start_run() adds them
+        balances = dict(self.db.execute(
+            "SELECT recipient, SUM(lamports) FROM accruals WHERE wallet IN (?, '') "
+            "GROUP BY recipient ORDER BY MIN(rowid)", (str(wallet),)
+        ))
+        for recipient, lamports in self._merge(shares).items():
+            balances[recipient] = balances.get(recipient, 0) + lamports
+        return [(Pubkey(recipient), lamports) for recipient, lamports in balances.items()
+                if lamports >= payout_threshold and lamports > 0]
+
+    @staticmethod
+    def _merge(shares: List[Tuple[Pubkey, int]]) -> Dict[bytes, int]:
+        merged: Dict[bytes, int] = {}
+        for owner, lamports in shares:
+            if lamports > 0:
+                merged[bytes(owner)] = merged.get(bytes(owner), 0) + lamports
+        return merged
+
+    def _credit(self, wallet: Union[Pubkey, str], amounts: Dict[bytes, int]):
+        self.db.executemany(
+            "INSERT INTO accruals (wallet, recipient, lamports) VALUES (?, ?, ?) "
+            "ON CONFLICT (wallet, recipient) DO UPDATE SET lamports = lamports + excluded.lamports",
+            ((str(wallet), recipient, lamports) for recipient, lamports in amounts.items())
+        )
+
+    def accrued(self, wallet: Pubkey) -> Tuple[int, int]:
+        """(holder count, lamports) this wallet owes but has not paid out yet"""
+        return self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(lamports), 0) FROM accruals WHERE wallet = ?", (str(wallet),)
+        ).fetchone()
+
+    def unfinished_runs(self, wallet: Pubkey) -> List[int]:
+        rows = self.db.execute(
+            "SELECT id FROM runs WHERE wallet = ? AND status = 'distributing' ORDER BY id", (str(wallet),)
+        )
+        return [run_id for (run_id,) in rows]
+
+    def pending(self, run_id: int) -> List[Tuple[Pubkey, int]]:
+        rows = self.db.execute(
+            "SELECT recipient, lamports FROM payouts WHERE run_id = ? AND state = ? ORDER BY rowid",
+            (run_id, PENDING)
+        )
+        return [(Pubkey(recipient), lamports) for recipient, lamports in rows]
+
+    def in_flight(self, run_id: int) -> Dict[Tuple[str, int], List[Tuple[Pubkey, int]]]:
+        """Sent-but-unconfirmed payouts grouped by (signature, last_valid_block_height)"""
+        rows = self.db.execute(
+            "SELECT signature, last_valid_block_height, recipient, lamports FROM payouts "
+            "WHERE run_id = ? AND state = ? ORDER BY rowid",
+            (run_id, SENT)
+        )
+        batches: Dict[Tuple[str, int], List[Tuple[Pubkey, int]]] = {}
+        for signature, last_valid_block_height, recipient, lamports in rows:
+            batches.setdefault((signature, last_valid_block_height), []).append((Pubkey(recipient), lamports))
+        return batches
+
+    def _update(self, run_id: int, batch: List[Tuple[Pubkey, int]], state: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self.db:
+            self.db.executemany(
+                f"UPDATE payouts SET state = ?{', ' + columns if columns else ''} WHERE run_id = ? AND recipient = ?",
+                ((state, *fields.values(), run_id, bytes(owner)) for owner, _ in batch)
+            )
+
+    def mark_sent(self, run_id: int, batch: List[Tuple[Pubkey, int]], signature: str, last_valid_block_height: int):
+        self._update(run_id, batch, SENT, signature=signature,
+                     last_valid_block_height=last_valid_block_height, error=None)
+
+    def mark_pending(self, run_id: int, batch: List[Tuple[Pubkey, int]], error: str):
+        self._update(run_id, batch, PENDING, error=error)
+
+    def mark_confirmed(self, run_id: int, batch: List[Tuple[Pubkey, int]], signature: str):
+        self._update(run_id, batch, CONFIRMED, signature=signature, error=None)
+
+    def mark_failed(self, run_id: int, batch: List[Tuple[Pubkey, int]], error: str):
+        """Finalize failed payouts and return their lamports to the accrual ledger for a later run"""
+        with self.db:
+            refunds: Dict[bytes, int] = {}
+            for owner, _ in batch:
+                row = self.db.execute(
+                    "SELECT lamports FROM payouts WHERE run_id = ? AND recipient = ? AND state != ?",
+                    (run_id, bytes(owner), FAILED)
+                ).fetchone()
+                if row is not None:
+                    refunds[bytes(owner)] = row[0]
+
+            self.db.executemany(
+                "UPDATE payouts SET state = ?, error = ? WHERE run_id = ? AND recipient = ?",
+                ((FAILED, error, run_id, recipient) for recipient in refunds)
+            )
+            (wallet,) = self.db.execute("SELECT wallet FROM runs WHERE id = ?", (run_id,)).fetchone()
+            self._credit(wallet, refunds)
+
+    def confirmed(self, run_id: int) -> List[Tuple[Pubkey, int, str]]:
+        """(recipient, lamports, signature) of every confirmed payout in a run"""
+        rows = self.db.execute(
+            "SELECT recipient, lamports, signature FROM payouts WHERE run_id = ? AND state = ? ORDER BY rowid",
+            (run_id, CONFIRMED)
+        )
+        return [(Pubkey(recipient), lamports, signature) for recipient, lamports, signature in rows]
+
+    def summary(self, run_id: int) -> Dict[str, Tuple[int, int]]:
+        """(payout count, lamports) per state"""
+        rows = self.db.execute(
+            "SELECT state, COUNT(*), COALESCE(SUM(lamports), 0) FROM payouts WHERE run_id = ? GROUP BY state",
+            (run_id,)
+        )
+        return {state: (count, lamports) for state, count, lamports in rows}
+
+    def finish_run(self, run_id: int):
+        with self.db:
+            self.db.execute(
+                "UPDATE runs SET status = 'completed', completed_at = CURRENT_TIMESTAMP WHERE id = ?", (run_id,)
+            )
+
+    def unrecorded_runs(self, wallet: Pubkey) -> List[int]:
+        """Completed runs whose confirmed payouts are not in the Supabase payouts table yet"""
+        rows = self.db.execute(
+            "SELECT id FROM runs WHERE wallet = ? AND status = 'completed' AND history_recorded = 0 ORDER BY id",
+            (str(wallet),)
+        )
+        return [run_id for (run_id,) in rows]
+
+    def mark_history_recorded(self, run_id: int):
+        with self.db:
+            self.db.execute("UPDATE runs SET history_recorded = 1 WHERE id = ?", (run_id,))
+
+    def lookup_tables(self, authority: Pubkey) -> List[Pubkey]:
+        """Address lookup tables created by this wallet, oldest first"""
+        rows = self.db.execute(
+            "SELECT address FROM lookup_tables WHERE authority = ? ORDER BY rowid", (str(authority),)
+        )
+        return [Pubkey.from_string(address) for (address,) in rows]
+
+    def add_lookup_table(self, authority: Pubkey, address: Pubkey):
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO lookup_tables (address, authority) VALUES (?, ?)", (str(address), str(authority))
+            )
+
+    def remove_lookup_table(self, address: Pubkey):
+        with self.db:
+            self.db.execute("DELETE FROM lookup_tables WHERE address = ?", (str(address),))
+
+    def close(self):
+        self.db.close()
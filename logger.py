@@ -1,19 +1,42 @@
 import os
-from supabase import create_client, Client
+import json
+import time
+import queue
+import fcntl
+import atexit
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
+from metrics import current as current_metrics
+
+# Entries are bulk-inserted once this many are queued, or after FLUSH_INTERVAL seconds
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0
+
+# Append-only JSON lines file holding entries that could not be written to Supabase
+SPOOL_PATH = os.getenv("COLLECTOR_LOG_SPOOL", "collector_logs.spool")
+
+_STOP = object()
 
 class CollectorLogger:
-    def __init__(self):
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_KEY")
+    def __init__(self, spool_path: str = SPOOL_PATH, batch_size: int = FLUSH_BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        # The Supabase client is created on the background thread, off the startup path
+        self.supabase = None
+        self.enabled = bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"))
 
-        if url and key:
-            self.supabase = create_client(url, key)
-            self.enabled = True
-        else:
-            self.supabase = None
-            self.enabled = False
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self._thread = None
+
+        if self.enabled:
+            # Database writes happen on a background thread so log() never blocks the caller
+            self._thread = threading.Thread(target=self._run, name="collector-logger", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
 
     def log(self, level: str, message: str, sol_amount: Optional[float] = None,
             tx_signature: Optional[str] = None, metadata: Optional[dict] = None):
@@ -22,25 +45,17 @@ class CollectorLogger:
         if not self.enabled:
             return
 
-        try:
-            log_entry = {
-                'level': level,
-                'message': message,
-                'timestamp': datetime.utcnow().isoformat()
-            }
-
-            if sol_amount is not None:
-                log_entry['sol_amount'] = float(sol_amount)
+        # Bulk inserts require every row to carry the same keys
+        log_entry = {
+            'level': level,
+            'message': message,
+            'timestamp': datetime.utcnow().isoformat(),
+            'sol_amount': float(sol_amount) if sol_amount is not None else None,
+            'tx_signature': tx_signature or None,
+            'metadata': metadata or {}
+        }
 
-            if tx_signature:
-                log_entry['tx_signature'] = tx_signature
-
-            if metadata:
-                log_entry['metadata'] = metadata
-
-            self.supabase.table('collector_logs').insert(log_entry).execute()
-        except Exception as e:
-            print(f"Failed to write log to database: {e}")
+        self.queue.put(log_entry)
 
     def info(self, message: str, **kwargs):
         self.log('info', message, **kwargs)
@@ -53,3 +68,141 @@ class CollectorLogger:
 
     def warning(self, message: str, **kwargs):
         self.log('warning', message, **kwargs)
+
+    def submit(self, fn: Callable[[], None]):
+        """Run a blocking database call on the background thread, in order with queued logs"""
+        if self.enabled:
+            self.queue.put(fn)
+        else:
+            fn()
+
+    def close(self, timeout: float = 10.0):
+        """Flush queued entries and stop the background writer"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _connect(self):
+        from supabase import create_client
+
+        try:
+            self.supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        except Exception as e:
+            print(f"Failed to create Supabase client for logs: {e}")
+
+    def _run(self):
+        self._connect()
+        self._replay_spool()
+
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                if pending:
+                    self._flush(pending)
+                return
+
+            if callable(item):
+                try:
+                    item()
+                except Exception as e:
+                    print(f"Background task failed: {e}")
+            elif item is not None:
+                pending.append(item)
+
+            if len(pending) >= self.batch_size or time.monotonic() >= deadline:
+                if pending:
+                    self._flush(pending)
+                    pending = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _insert(self, entries: List[dict]):
+        if self.supabase is None:
+            raise RuntimeError("Supabase client unavailable")
+        with current_metrics().timed("supabase", "insert_collector_logs"):
+            self.supabase.table('collector_logs').insert(entries).execute()
+
+    def _flush(self, entries: List[dict]):
+        try:
+            self._insert(entries)
+        except Exception as e:
+            print(f"Failed to write {len(entries)} logs to database, spooling to {self.spool_path}: {e}")
+            self._spool(entries)
+            return
+
+        # Database is reachable again, push anything left over from earlier failures
+        if os.path.exists(self.spool_path):
+            self._replay_spool()
+
+    @contextmanager
+    def _spool_lock(self, blocking: bool = True):
+        """flock shared by every process using this spool (the daemon and timer runs), like run_lock"""
+        with open(self.spool_path + ".lock", 'w') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _spool(self, entries: List[dict]):
+        try:
+            with self._spool_lock():
+                with open(self.spool_path, 'a') as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            print(f"Failed to spool logs to {self.spool_path}: {e}")
+
+    def _replay_spool(self):
+        if not os.path.exists(self.spool_path):
+            return
+
+        try:
+            with self._spool_lock(blocking=False) as acquired:
+                # Another process is replaying it already
+                if acquired:
+                    self._replay_spool_locked()
+        except Exception as e:
+            print(f"Failed to replay log spool {self.spool_path}: {e}")
+
+    def _replay_spool_locked(self):
+        if not os.path.exists(self.spool_path):
+            return
+
+        try:
+            with open(self.spool_path) as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            print(f"Failed to read log spool {self.spool_path}: {e}")
+            return
+
+        for i in range(0, len(entries), self.batch_size):
+            try:
+                self._insert(entries[i:i + self.batch_size])
+            except Exception as e:
+                print(f"Failed to replay spooled logs, keeping {len(entries) - i} for later: {e}")
+                self._rewrite_spool(entries[i:])
+                return
+
+        os.remove(self.spool_path)
+        if entries:
+            print(f"Replayed {len(entries)} spooled logs to database")
+
+    def _rewrite_spool(self, entries: List[dict]):
+        tmp_path = self.spool_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.spool_path)
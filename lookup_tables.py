@@ -0,0 +1,208 @@
+import os
+import asyncio
+import struct
+from solders.pubkey import Pubkey
+from solders.keypair import Keypair
+from solders.hash import Hash
+from solders.instruction import Instruction, AccountMeta
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.transaction import Transaction as SoldersTransaction
+from solders.address_lookup_table_account import (
+    ID as LOOKUP_TABLE_PROGRAM_ID, LOOKUP_TABLE_MAX_ADDRESSES,
+    AddressLookupTable, AddressLookupTableAccount, derive_lookup_table_address,
+)
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed, Finalized
+from solana.rpc.types import TxOpts
+from solana.rpc.core import RPCException
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+from journal import DistributionJournal
+from payouts import BlockhashCache
+from confirmations import ConfirmationTracker
+
+# PAYOUT_LOOKUP_TABLES=1 keeps holder owners in lookup tables and sends payouts as v0 transactions
+PAYOUT_LOOKUP_TABLES = os.getenv("PAYOUT_LOOKUP_TABLES", "0") == "1"
+
+# Addresses per ExtendLookupTable transaction (30 * 32 bytes still fits the 1232-byte limit)
+EXTEND_CHUNK = 30
+
+# Address lookup table instruction discriminators (bincode u32 enum index)
+CREATE_LOOKUP_TABLE = 0
+EXTEND_LOOKUP_TABLE = 2
+
+# Addresses added to a table become usable one slot after the extension
+SLOT_POLL_INTERVAL = 0.4
+
+# deactivation_slot of a table that was never deactivated (u64::MAX)
+ACTIVE_DEACTIVATION_SLOT = 2 ** 64 - 1
+
+def create_lookup_table_ix(authority: Pubkey, payer: Pubkey, recent_slot: int) -> Tuple[Instruction, Pubkey]:
+    table, bump = derive_lookup_table_address(authority, recent_slot)
+    return Instruction(
+        LOOKUP_TABLE_PROGRAM_ID,
+        struct.pack("<IQB", CREATE_LOOKUP_TABLE, recent_slot, bump),
+        [
+            AccountMeta(table, is_signer=False, is_writable=True),
+            AccountMeta(authority, is_signer=True, is_writable=False),
+            AccountMeta(payer, is_signer=True, is_writable=True),
+            AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        ]
+    ), table
+
+def extend_lookup_table_ix(table: Pubkey, authority: Pubkey, payer: Pubkey, addresses: List[Pubkey]) -> Instruction:
+    return Instruction(
+        LOOKUP_TABLE_PROGRAM_ID,
+        struct.pack("<IQ", EXTEND_LOOKUP_TABLE, len(addresses)) + b"".join(bytes(a) for a in addresses),
+        [
+            AccountMeta(table, is_signer=False, is_writable=True),
+            AccountMeta(authority, is_signer=True, is_writable=False),
+            AccountMeta(payer, is_signer=True, is_writable=True),
+            AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+        ]
+    )
+
+class LookupTableManager:
+    """Address Lookup Tables owned by the payout wallet, holding every known recipient.
+
+    Table addresses are kept in the distribution journal; their contents are read from
+    chain. New recipients are appended to the newest table with room, and a new table is
+    created once it holds LOOKUP_TABLE_MAX_ADDRESSES (256) addresses.
+    """
+
+    def __init__(self, client: AsyncClient, wallet: Keypair, journal: DistributionJournal):
+        self.client = client
+        self.wallet = wallet
+        self.journal = journal
+        self.tables: Dict[Pubkey, List[Pubkey]] = {}
+        self.blockhashes = BlockhashCache(client)
+        self._last_slot = 0
+        self._created: set = set()  # Tables whose create transaction confirmed in this run
+
+    @property
+    def accounts(self) -> List[AddressLookupTableAccount]:
+        return [AddressLookupTableAccount(key, addresses) for key, addresses in self.tables.items()]
+
+    def lookup(self) -> Dict[Pubkey, Pubkey]:
+        """Recipient -> table holding it"""
+        return {address: key for key, addresses in self.tables.items() for address in addresses}
+
+    async def load(self):
+        keys = self.journal.lookup_tables(self.wallet.pubkey())
+        if not keys:
+            return
+
+        response = await self.client.get_multiple_accounts(keys, commitment=Confirmed, encoding="base64")
+        accounts = dict(zip(keys, response.value))
+
+        # A lagging endpoint may not have seen a table yet; only one endpoint's finalized
+        # state is trusted to say it does not exist
+        missing = [key for key, account in accounts.items() if account is None]
+        if missing:
+            with getattr(self.client, "pinned", nullcontext)():
+                response = await self.client.get_multiple_accounts(missing, commitment=Finalized, encoding="base64")
+            accounts.update(zip(missing, response.value))
+
+        self.tables = {}
+        for key, account in accounts.items():
+            if account is None:
+                if key in self._created:
+                    continue  # Created by this run but not finalized yet; used from the next run
+                # The create transaction never landed
+                self.journal.remove_lookup_table(key)
+                continue
+
+            table = AddressLookupTable.deserialize(bytes(account.data))
+            if table.meta.deactivation_slot != ACTIVE_DEACTIVATION_SLOT:
+                continue  # Deactivated tables can no longer be used
+            self.tables[key] = list(table.addresses)
+
+    async def ensure(self, recipients: List[Pubkey]):
+        """Add every recipient not yet in a table, creating tables as needed"""
+        await self.load()
+        known = set(self.lookup())
+        missing = [r for r in dict.fromkeys(recipients) if r not in known]
+        if not missing:
+            return
+
+        print(f"📇 Adding {len(missing)} new recipients to address lookup tables...")
+
+        while missing:
+            table = self._table_with_room() or await self._create_table()
+            room = LOOKUP_TABLE_MAX_ADDRESSES - len(self.tables[table])
+            added, missing = missing[:room], missing[room:]
+
+            # Extensions of one table only append, so they can be in flight together
+            await self._send_and_confirm([
+                self._build(extend_lookup_table_ix(table, self.wallet.pubkey(), self.wallet.pubkey(),
+                                                   added[i:i + EXTEND_CHUNK]))
+                for i in range(0, len(added), EXTEND_CHUNK)
+            ], "extend")
+            self.tables[table].extend(added)
+
+        await self._wait_next_slot()
+        await self.load()
+
+    def _table_with_room(self) -> Optional[Pubkey]:
+        newest = next(reversed(self.tables), None)
+        if newest is not None and len(self.tables[newest]) < LOOKUP_TABLE_MAX_ADDRESSES:
+            return newest
+        return None
+
+    async def _create_table(self) -> Pubkey:
+        # The table address is derived from the slot, so each table needs a different one
+        recent_slot = (await self.client.get_slot(commitment=Finalized)).value
+        while recent_slot <= self._last_slot:
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
+            recent_slot = (await self.client.get_slot(commitment=Finalized)).value
+        self._last_slot = recent_slot
+
+        ix, table = create_lookup_table_ix(self.wallet.pubkey(), self.wallet.pubkey(), recent_slot)
+
+        # Recorded before sending so a crash never leaves an untracked table holding rent
+        self.journal.add_lookup_table(self.wallet.pubkey(), table)
+        await self._send_and_confirm([self._build(ix)], "create",
+                                     on_failed=lambda: self.journal.remove_lookup_table(table))
+
+        print(f"   📇 Created lookup table {table}")
+        self._created.add(table)
+        self.tables[table] = []
+        return table
+
+    def _build(self, ix: Instruction) -> Callable[[Hash], SoldersTransaction]:
+        return lambda blockhash: SoldersTransaction.new_signed_with_payer(
+            [ix], self.wallet.pubkey(), [self.wallet], blockhash)
+
+    async def _send_and_confirm(self, builders: List[Callable[[Hash], SoldersTransaction]], label: str,
+                                on_failed: Optional[Callable[[], None]] = None):
+        """Send every transaction and wait until all are confirmed.
+
+        `on_failed` runs before raising when one is known not to have landed: rejected by
+        the node, failed on chain, or expired with no trace in the ledger.
+        """
+        tracker = ConfirmationTracker(self.client, self.blockhashes)
+
+        async def send(build):
+            blockhash, last_valid_block_height = await self.blockhashes.latest()
+            tx = build(blockhash)
+            await self.client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=False))
+            tracker.track(str(tx.signatures[0]), last_valid_block_height, build)
+
+        try:
+            await asyncio.gather(*(send(build) for build in builders))
+        except RPCException:
+            if on_failed:
+                on_failed()
+            raise
+        results = await tracker.wait()
+
+        failed = [r for r in results if not r.ok]
+        if failed:
+            if on_failed:
+                on_failed()
+            raise RuntimeError(f"{len(failed)} lookup table {label} transactions failed: {failed[0].error}")
+
+    async def _wait_next_slot(self):
+        start = (await self.client.get_slot(commitment=Confirmed)).value
+        while (await self.client.get_slot(commitment=Confirmed)).value <= start:
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
@@ -0,0 +1,166 @@
+import os
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# node_exporter textfile collector target, e.g. /var/lib/node_exporter/textfile_collector/atomrs.prom
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+
+# Prometheus default latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if error:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.sum / self.count * 1000, 1) if self.count else 0.0,
+            'total_sec': round(self.sum, 3),
+        }
+
+class RunMetrics:
+    """Phase durations and per-method call latencies of one collector run.
+
+    Phases accumulate, so a phase entered once per wallet reports its total time.
+    Calls may be recorded from the logger thread, hence the lock.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases: Dict[str, float] = {}
+        self.calls: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def observe(self, backend: str, method: str, seconds: float, error: bool = False):
+        with self._lock:
+            self.calls.setdefault((backend, method), Histogram()).observe(seconds, error)
+
+    @contextmanager
+    def timed(self, backend: str, method: str):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(backend, method, time.perf_counter() - started, error)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'duration_sec': round(time.time() - self.started, 3),
+                'phases_sec': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                'calls': {f"{backend}.{method}": h.summary() for (backend, method), h in sorted(self.calls.items())},
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of this run"""
+        lines = [
+            "# HELP atomrs_run_timestamp_seconds Start time of the last collector run.",
+            "# TYPE atomrs_run_timestamp_seconds gauge",
+            f"atomrs_run_timestamp_seconds {self.started:.3f}",
+            "# HELP atomrs_run_duration_seconds Wall time of the last collector run.",
+            "# TYPE atomrs_run_duration_seconds gauge",
+            f"atomrs_run_duration_seconds {time.time() - self.started:.6f}",
+            "# HELP atomrs_phase_duration_seconds Time spent in each phase of the last run.",
+            "# TYPE atomrs_phase_duration_seconds gauge",
+        ]
+        with self._lock:
+            for name, seconds in self.phases.items():
+                lines.append(f'atomrs_phase_duration_seconds{{phase="{name}"}} {seconds:.6f}')
+
+            lines += [
+                "# HELP atomrs_call_latency_seconds Latency of RPC and Supabase calls in the last run.",
+                "# TYPE atomrs_call_latency_seconds histogram",
+            ]
+            for (backend, method), h in sorted(self.calls.items()):
+                labels = f'backend="{backend}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), h.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'atomrs_call_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"atomrs_call_latency_seconds_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"atomrs_call_latency_seconds_count{{{labels}}} {h.count}")
+
+            lines += [
+                "# HELP atomrs_call_errors Failed RPC and Supabase calls in the last run.",
+                "# TYPE atomrs_call_errors gauge",
+            ]
+            for (backend, method), h in sorted(self.calls.items()):
+                lines.append(f'atomrs_call_errors{{backend="{backend}",method="{method}"}} {h.errors}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str = METRICS_TEXTFILE):
+        """Atomically replace the textfile so node_exporter never reads a partial write"""
+        if not path:
+            return
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️  Failed to write metrics to {path}: {e}")
+
+_current = RunMetrics()
+
+def current() -> RunMetrics:
+    """Metrics of the run in progress"""
+    return _current
+
+def start_run() -> RunMetrics:
+    global _current
+    _current = RunMetrics()
+    return _current
+
+class InstrumentedClient:
+    """Wraps an AsyncClient so every RPC coroutine is counted and timed in the current run"""
+
+    def __init__(self, client, backend: str = "solana"):
+        self._client = client
+        self._backend = backend
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attr) or name == "close":
+            return attr
+
+        async def call(*args, **kwargs):
+            # Raw requests are recorded under their JSON-RPC method
+            method = args[0] if name == "raw_request" and args else name
+            with current().timed(self._backend, method):
+                return await attr(*args, **kwargs)
+        return call
+
+    async def close(self):
+        await self._client.close()
@@ -0,0 +1,298 @@
+from solders.pubkey import Pubkey
+from solders.keypair import Keypair
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.system_program import transfer, TransferParams, ID as SYSTEM_PROGRAM_ID
+from solders.transaction import Transaction as SoldersTransaction, VersionedTransaction
+from solders.message import MessageV0
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from solana.rpc.core import RPCException
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from priority_fees import ComputeBudget, COMPUTE_BUDGET_KEYS, COMPUTE_BUDGET_INSTRUCTIONS, COMPUTE_BUDGET_IX_SIZE
+import asyncio
+import time
+
+# Maximum serialized size of a legacy transaction (IPv6 MTU minus headers)
+PACKET_DATA_SIZE = 1232
+
+SIGNATURE_SIZE = 64
+PUBKEY_SIZE = 32
+MESSAGE_HEADER_SIZE = 3
+BLOCKHASH_SIZE = 32
+
+# system_program transfer: u32 instruction index + u64 lamports, accounts [from, to]
+TRANSFER_DATA_SIZE = 12
+TRANSFER_ACCOUNTS = 2
+
+# A transaction may lock at most this many accounts, however they are referenced
+MAX_TX_ACCOUNT_LOCKS = 64
+
+# A blockhash stays valid for ~150 blocks (~60s); refresh well before expiry
+BLOCKHASH_MAX_AGE = 30.0
+
+def shortvec_len(n: int) -> int:
+    """Number of bytes used by Solana's compact-u16 length prefix"""
+    if n < 0x80:
+        return 1
+    if n < 0x4000:
+        return 2
+    return 3
+
+def compiled_instruction_size(num_accounts: int, data_len: int) -> int:
+    """Serialized size of one compiled instruction inside a message"""
+    return 1 + shortvec_len(num_accounts) + num_accounts + shortvec_len(data_len) + data_len
+
+TRANSFER_IX_SIZE = compiled_instruction_size(TRANSFER_ACCOUNTS, TRANSFER_DATA_SIZE)
+
+def legacy_tx_size(num_signers: int, num_keys: int, num_instructions: int, instructions_size: int) -> int:
+    """Serialized size of a legacy transaction with the given shape"""
+    return (
+        shortvec_len(num_signers) + num_signers * SIGNATURE_SIZE
+        + MESSAGE_HEADER_SIZE
+        + shortvec_len(num_keys) + num_keys * PUBKEY_SIZE
+        + BLOCKHASH_SIZE
+        + shortvec_len(num_instructions) + instructions_size
+    )
+
+def v0_tx_size(num_signers: int, num_static_keys: int, num_instructions: int, instructions_size: int,
+               lookups: Sequence[int]) -> int:
+    """Serialized size of a v0 transaction loading `lookups[i]` writable addresses from table i"""
+    return (
+        legacy_tx_size(num_signers, num_static_keys, num_instructions, instructions_size)
+        + 1  # version prefix
+        + shortvec_len(len(lookups))
+        + sum(PUBKEY_SIZE + shortvec_len(n) + n + shortvec_len(0) for n in lookups)
+    )
+
+def pack_transfers(payer: Pubkey, rewards: List[Tuple[Pubkey, int]], max_size: int = PACKET_DATA_SIZE,
+                   compute_budget: bool = False,
+                   lookup: Optional[Dict[Pubkey, Pubkey]] = None) -> List[List[Tuple[Pubkey, int]]]:
+    """Greedily pack (recipient, lamports) transfers into batches that fit one transaction each.
+
+    With `compute_budget`, room is left for the two ComputeBudget instructions. With
+    `lookup` (recipient -> lookup table address), batches are sized for v0 messages
+    where those recipients cost a one-byte table index instead of a 32-byte key.
+    """
+    extra_keys = COMPUTE_BUDGET_KEYS if compute_budget else 0
+    extra_instructions = COMPUTE_BUDGET_INSTRUCTIONS if compute_budget else 0
+    extra_size = COMPUTE_BUDGET_IX_SIZE if compute_budget else 0
+
+    batches = []
+    batch = []
+    keys = {payer, SYSTEM_PROGRAM_ID}
+    tables: Dict[Pubkey, Set[Pubkey]] = {}
+
+    def fits(owner: Pubkey) -> bool:
+        table = lookup.get(owner) if lookup is not None and owner not in keys else None
+        num_keys = len(keys) + (0 if owner in keys or table else 1) + extra_keys
+        counts = {t: len(members) for t, members in tables.items()}
+        if table and owner not in tables.get(table, ()):
+            counts[table] = counts.get(table, 0) + 1
+
+        num_instructions = len(batch) + 1 + extra_instructions
+        instructions_size = (len(batch) + 1) * TRANSFER_IX_SIZE + extra_size
+        if lookup is None:
+            size = legacy_tx_size(1, num_keys, num_instructions, instructions_size)
+        else:
+            size = v0_tx_size(1, num_keys, num_instructions, instructions_size, list(counts.values()))
+        return size <= max_size and num_keys + sum(counts.values()) <= MAX_TX_ACCOUNT_LOCKS
+
+    for owner, lamports in rewards:
+        if batch and not fits(owner):
+            batches.append(batch)
+            batch = []
+            keys = {payer, SYSTEM_PROGRAM_ID}
+            tables = {}
+
+        batch.append((owner, lamports))
+        table = lookup.get(owner) if lookup is not None and owner not in keys else None
+        if table:
+            tables.setdefault(table, set()).add(owner)
+        else:
+            keys.add(owner)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+@dataclass
+class BatchResult:
+    """Outcome of sending one packed batch of payouts"""
+    recipients: List[Tuple[Pubkey, int]]
+    signature: Optional[str] = None
+    error: Optional[str] = None
+    last_valid_block_height: int = 0
+    compute_budget: List[Instruction] = field(default_factory=list)
+    retryable: bool = False  # Failed before it could land, so it is safe to send again later
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def lamports(self) -> int:
+        return sum(lamports for _, lamports in self.recipients)
+
+def build_transfer_tx(wallet: Keypair, batch: List[Tuple[Pubkey, int]], blockhash: Hash,
+                      compute_budget: Sequence[Instruction] = (),
+                      lookup_tables: Sequence[AddressLookupTableAccount] = ()
+                      ) -> Union[SoldersTransaction, VersionedTransaction]:
+    """Build and sign one transaction paying every recipient in the batch.
+
+    With `lookup_tables` this is a v0 transaction; only the tables it uses are referenced.
+    """
+    instructions = list(compute_budget) + [
+        transfer(TransferParams(from_pubkey=wallet.pubkey(), to_pubkey=owner, lamports=lamports))
+        for owner, lamports in batch
+    ]
+    if lookup_tables:
+        message = MessageV0.try_compile(wallet.pubkey(), instructions, list(lookup_tables), blockhash)
+        return VersionedTransaction(message, [wallet])
+    return SoldersTransaction.new_signed_with_payer(instructions, wallet.pubkey(), [wallet], blockhash)
+
+class BlockhashCache:
+    """Shares one recent blockhash across concurrent sends until it nears expiry"""
+
+    def __init__(self, client: AsyncClient, max_age: float = BLOCKHASH_MAX_AGE):
+        self.client = client
+        self.max_age = max_age
+        self.blockhash: Optional[Hash] = None
+        self.last_valid_block_height = 0
+        self.fetched_at = 0.0
+        self.fetches = 0
+        self._lock = asyncio.Lock()
+
+    async def latest(self) -> Tuple[Hash, int]:
+        """Current blockhash and the last block height at which it is still valid"""
+        async with self._lock:
+            if self.blockhash is None or time.monotonic() - self.fetched_at > self.max_age:
+                response = await self.client.get_latest_blockhash()
+                self.blockhash = response.value.blockhash
+                self.last_valid_block_height = response.value.last_valid_block_height
+                self.fetched_at = time.monotonic()
+                self.fetches += 1
+            return self.blockhash, self.last_valid_block_height
+
+    async def get(self) -> Hash:
+        blockhash, _ = await self.latest()
+        return blockhash
+
+    def invalidate(self):
+        self.blockhash = None
+
+async def batch_compute_budget(wallet: Keypair, batch: List[Tuple[Pubkey, int]], blockhash: Hash,
+                               budget: Optional[ComputeBudget],
+                               lookup_tables: Sequence[AddressLookupTableAccount] = ()) -> List[Instruction]:
+    """ComputeBudget instructions for a payout batch, or none without a budget"""
+    if not budget:
+        return []
+    # Transfer cost depends only on the number of transfers, so that is the shape
+    return await budget.instructions(
+        ("transfers", len(batch)),
+        lambda prefix: build_transfer_tx(wallet, batch, blockhash, prefix, lookup_tables),
+        [wallet.pubkey()]
+    )
+
+# Called with (batch, signature, last_valid_block_height) right before a transaction is sent
+BeforeSend = Callable[[List[Tuple[Pubkey, int]], str, int], None]
+
+async def send_batch(client: AsyncClient, wallet: Keypair, batch: List[Tuple[Pubkey, int]],
+                     blockhashes: BlockhashCache, before_send: Optional[BeforeSend] = None,
+                     budget: Optional[ComputeBudget] = None,
+                     lookup_tables: Sequence[AddressLookupTableAccount] = (),
+                     skip_preflight: bool = False) -> List[BatchResult]:
+    """Send a packed batch, bisecting on failure so one bad recipient only fails itself.
+
+    With `skip_preflight` the node does not simulate it first; use that only for
+    batches that already passed a simulation.
+    """
+    try:
+        blockhash, last_valid_block_height = await blockhashes.latest()
+        compute_budget = await batch_compute_budget(wallet, batch, blockhash, budget, lookup_tables)
+        tx = build_transfer_tx(wallet, batch, blockhash, compute_budget, lookup_tables)
+    except Exception as e:
+        # Nothing was signed, let alone sent
+        return [BatchResult(batch, error=str(e), retryable=True)]
+
+    signature = str(tx.signatures[0])
+    if before_send:
+        before_send(batch, signature, last_valid_block_height)
+
+    try:
+        await client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=skip_preflight))
+        return [BatchResult(batch, signature=signature, last_valid_block_height=last_valid_block_height,
+                            compute_budget=compute_budget)]
+    except RPCException as e:
+        # The node rejected the transaction, so it can never land
+        expired = "BlockhashNotFound" in str(e) or "Blockhash not found" in str(e)
+        if expired:
+            blockhashes.invalidate()
+        if len(batch) == 1:
+            return [BatchResult(batch, error=str(e), retryable=expired)]
+    except Exception:
+        # Unknown whether the node forwarded it (e.g. a timeout): treat it as sent and
+        # let confirmation decide, rather than risk paying the same recipients twice
+        return [BatchResult(batch, signature=signature, last_valid_block_height=last_valid_block_height,
+                            compute_budget=compute_budget)]
+
+    # Transactions are atomic, so split the batch and retry each half
+    mid = len(batch) // 2
+    return (await send_batch(client, wallet, batch[:mid], blockhashes, before_send, budget, lookup_tables,
+                             skip_preflight)
+            + await send_batch(client, wallet, batch[mid:], blockhashes, before_send, budget, lookup_tables,
+                               skip_preflight))
+
+class PayoutSender:
+    """Sends packed payout batches with up to `concurrency` transactions in flight"""
+
+    def __init__(self, client: AsyncClient, wallet: Keypair, concurrency: int = 8,
+                 before_send: Optional[BeforeSend] = None, compute_budget: Optional[ComputeBudget] = None,
+                 lookup_tables: Sequence[AddressLookupTableAccount] = (), skip_preflight: bool = False):
+        self.client = client
+        self.wallet = wallet
+        self.concurrency = max(1, concurrency)
+        self.before_send = before_send
+        self.compute_budget = compute_budget
+        self.lookup_tables = list(lookup_tables)
+        self.skip_preflight = skip_preflight
+        self.blockhashes = BlockhashCache(client)
+        self.results: List[BatchResult] = []
+        self.elapsed = 0.0
+
+    async def send_all(self, batches: List[List[Tuple[Pubkey, int]]],
+                       on_result: Optional[Callable[[BatchResult], None]] = None) -> List[BatchResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(batch):
+            async with semaphore:
+                results = await send_batch(self.client, self.wallet, batch, self.blockhashes, self.before_send,
+                                           self.compute_budget, self.lookup_tables, self.skip_preflight)
+            for result in results:
+                self.results.append(result)
+                if on_result:
+                    on_result(result)
+
+        started = time.monotonic()
+        await asyncio.gather(*(run(batch) for batch in batches))
+        self.elapsed = time.monotonic() - started
+        return self.results
+
+    def throughput(self) -> dict:
+        """Achieved send rate for the last send_all() run"""
+        sent = [r for r in self.results if r.ok]
+        payouts = sum(len(r.recipients) for r in sent)
+        elapsed = self.elapsed or float("inf")
+        return {
+            "elapsed_sec": round(self.elapsed, 3),
+            "transactions": len(sent),
+            "payouts": payouts,
+            "tx_per_sec": round(len(sent) / elapsed, 2),
+            "payouts_per_sec": round(payouts / elapsed, 2),
+            "blockhash_fetches": self.blockhashes.fetches,
+            "concurrency": self.concurrency,
+            "simulations": self.compute_budget.simulations if self.compute_budget else 0,
+        }
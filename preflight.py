@@ -0,0 +1,158 @@
+import os
+import time
+import asyncio
+from solders.pubkey import Pubkey
+from solders.keypair import Keypair
+from solders.hash import Hash
+from solders.transaction import Transaction as SoldersTransaction, VersionedTransaction
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solana.rpc.async_api import AsyncClient
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple, Union
+from priority_fees import ComputeBudget, priority_fee_lamports
+from vaults import CreatorVault, build_claim_tx, claim_compute_budget
+
+# The payout pipeline is only imported when payouts are simulated
+if TYPE_CHECKING:
+    from payouts import BlockhashCache
+
+# BATCH_PREFLIGHT=1 simulates every claim and payout up front, drops the ones that would
+# fail and sends the rest with skip_preflight instead of having the node simulate each send
+BATCH_PREFLIGHT = os.getenv("BATCH_PREFLIGHT", "0") == "1"
+PREFLIGHT_CONCURRENCY = int(os.getenv("PREFLIGHT_CONCURRENCY", "16"))  # Simulations in flight
+
+# Base fee charged per transaction signature
+LAMPORTS_PER_SIGNATURE = 5000
+
+async def simulate(client: AsyncClient, tx: Union[SoldersTransaction, VersionedTransaction]) -> Tuple[Optional[str], int]:
+    """Simulation error (None if the transaction would succeed) and compute units consumed"""
+    if isinstance(tx, SoldersTransaction):
+        tx = VersionedTransaction.from_legacy(tx)
+    response = await client.simulate_transaction(tx)
+    error = response.value.err
+    return (None if error is None else str(error)), response.value.units_consumed or 0
+
+@dataclass
+class PreflightReport:
+    """Simulated transactions: what passed, what would fail, and what sending will cost"""
+    passed: List[Any] = field(default_factory=list)  # payout batches or vaults
+    rejected: List[Tuple[Any, str]] = field(default_factory=list)
+    compute_units: int = 0
+    fee_lamports: int = 0
+    transfer_lamports: int = 0
+    simulations: int = 0
+    elapsed: float = 0.0
+    wallet_error: Optional[str] = None  # Set when the fee payer, not the recipients, made simulations fail
+
+    def add(self, item: Any, units: int, fee: int, lamports: int = 0):
+        self.passed.append(item)
+        self.compute_units += units
+        self.fee_lamports += fee
+        self.transfer_lamports += lamports
+
+    def summary(self) -> dict:
+        return {
+            'transactions': len(self.passed),
+            'rejected': len(self.rejected),
+            'compute_units': self.compute_units,
+            'fee_lamports': self.fee_lamports,
+            'transfer_lamports': self.transfer_lamports,
+            'simulations': self.simulations,
+            'elapsed_sec': round(self.elapsed, 3),
+            'wallet_error': self.wallet_error,
+        }
+
+    def print(self, label: str):
+        print(f"🧪 Simulated {label}: {len(self.passed)} transactions pass, {len(self.rejected)} rejected "
+              f"({self.simulations} simulations in {self.elapsed:.2f}s)")
+        print(f"   • Compute units: {self.compute_units:,}")
+        print(f"   • Fees: {self.fee_lamports / 1e9:.9f} SOL "
+              f"({LAMPORTS_PER_SIGNATURE} lamports per signature + priority fees)")
+        if self.transfer_lamports:
+            print(f"   • Transfers: {self.transfer_lamports / 1e9:.9f} SOL")
+        if self.wallet_error:
+            print(f"   • Wallet error: {self.wallet_error}")
+
+async def preflight_claims(client: AsyncClient, vaults: List[CreatorVault], blockhash: Hash,
+                           budget: Optional[ComputeBudget] = None) -> PreflightReport:
+    """Simulate every vault's claim concurrently"""
+    report = PreflightReport()
+    started = time.monotonic()
+
+    async def check(vault):
+        compute_budget = await claim_compute_budget(vault, blockhash, budget)
+        return compute_budget, await simulate(client, build_claim_tx(vault, blockhash, compute_budget))
+
+    results = await asyncio.gather(*(check(vault) for vault in vaults), return_exceptions=True)
+    for vault, result in zip(vaults, results):
+        report.simulations += 1
+        if isinstance(result, Exception):
+            report.rejected.append((vault, str(result)))
+            continue
+        compute_budget, (error, units) = result
+        if error is not None:
+            report.rejected.append((vault, error))
+        else:
+            report.add(vault, units, LAMPORTS_PER_SIGNATURE + priority_fee_lamports(compute_budget, units))
+
+    report.elapsed = time.monotonic() - started
+    return report
+
+async def preflight_payouts(client: AsyncClient, wallet: Keypair, batches: List[List[Tuple[Pubkey, int]]],
+                            blockhashes: "BlockhashCache", budget: Optional[ComputeBudget] = None,
+                            lookup_tables: Sequence[AddressLookupTableAccount] = (),
+                            concurrency: int = PREFLIGHT_CONCURRENCY) -> PreflightReport:
+    """Simulate every payout batch concurrently, bisecting failed batches down to the failing recipients.
+
+    Rejected entries are single-recipient batches. Transport errors are raised, since
+    they say nothing about the recipients. Failures caused by the wallet itself (its
+    balance does not cover the run, or every batch fails) are not bisected: they set
+    `wallet_error` and leave the failing batches neither passed nor rejected.
+    """
+    from payouts import batch_compute_budget, build_transfer_tx
+
+    report = PreflightReport()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.monotonic()
+
+    async def simulate_batch(batch) -> Optional[str]:
+        blockhash, _ = await blockhashes.latest()
+        compute_budget = await batch_compute_budget(wallet, batch, blockhash, budget, lookup_tables)
+        async with semaphore:
+            error, units = await simulate(client, build_transfer_tx(wallet, batch, blockhash, compute_budget,
+                                                                    lookup_tables))
+        report.simulations += 1
+        if error is None:
+            report.add(batch, units, LAMPORTS_PER_SIGNATURE + priority_fee_lamports(compute_budget, units),
+                       sum(lamports for _, lamports in batch))
+        return error
+
+    async def settle(batch, error: str):
+        if len(batch) == 1:
+            report.rejected.append((batch, error))
+        else:
+            # Transactions are atomic, so split the batch to find the recipients that fail
+            mid = len(batch) // 2
+            await asyncio.gather(check(batch[:mid]), check(batch[mid:]))
+
+    async def check(batch):
+        error = await simulate_batch(batch)
+        if error is not None:
+            await settle(batch, error)
+
+    # Batches as packed first, so a wallet-wide failure costs one simulation per batch
+    errors = await asyncio.gather(*(simulate_batch(batch) for batch in batches))
+    failed = [(batch, error) for batch, error in zip(batches, errors) if error is not None]
+    if failed:
+        balance = (await client.get_balance(wallet.pubkey())).value
+        needed = sum(lamports for batch in batches for _, lamports in batch) + LAMPORTS_PER_SIGNATURE * len(batches)
+        if balance < needed:
+            report.wallet_error = (f"balance {balance / 1e9:.9f} SOL does not cover {needed / 1e9:.9f} SOL "
+                                   f"of transfers and fees ({failed[0][1]})")
+        elif len(batches) > 1 and len(failed) == len(batches):
+            report.wallet_error = f"every batch failed simulation ({failed[0][1]})"
+        else:
+            await asyncio.gather(*(settle(batch, error) for batch, error in failed))
+
+    report.elapsed = time.monotonic() - started
+    return report
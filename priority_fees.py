@@ -0,0 +1,135 @@
+import os
+import time
+import asyncio
+from solders.pubkey import Pubkey
+from solders.instruction import Instruction
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID, set_compute_unit_limit, set_compute_unit_price
+from solders.transaction import Transaction as SoldersTransaction, VersionedTransaction
+from solana.rpc.async_api import AsyncClient
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+# PRIORITY_FEES=1 adds measured SetComputeUnitLimit / SetComputeUnitPrice to claims and payouts
+PRIORITY_FEES = os.getenv("PRIORITY_FEES", "0") == "1"
+PRIORITY_FEE_PERCENTILE = int(os.getenv("PRIORITY_FEE_PERCENTILE", "75"))
+PRIORITY_FEE_CAP = int(os.getenv("PRIORITY_FEE_CAP_MICROLAMPORTS", "200000"))  # micro-lamports per CU
+
+# Headroom over the simulated compute units, since execution can vary slightly between runs
+COMPUTE_UNIT_MARGIN = 1.1
+MAX_COMPUTE_UNITS = 1_400_000
+
+# Recent fees cover the last 150 slots (~60s); refresh about as often as a blockhash
+FEE_MAX_AGE = 30.0
+
+# Both budget instructions together: one extra account key (the program) and their compiled size
+COMPUTE_BUDGET_KEYS = 1
+COMPUTE_BUDGET_INSTRUCTIONS = 2
+COMPUTE_BUDGET_IX_SIZE = (1 + 1 + 1 + 5) + (1 + 1 + 1 + 9)
+
+# ComputeBudget instruction discriminators
+SET_COMPUTE_UNIT_LIMIT = 2
+SET_COMPUTE_UNIT_PRICE = 3
+
+# Builds a signed transaction with the given instructions prepended
+TxBuilder = Callable[[List[Instruction]], Union[SoldersTransaction, VersionedTransaction]]
+
+def percentile(values: Sequence[int], pct: int) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * pct // 100)]
+
+async def get_recent_prioritization_fees(client: AsyncClient, accounts: List[Pubkey]) -> List[int]:
+    """Per-slot minimum priority fees (micro-lamports per CU) paid to lock these accounts.
+
+    solana-py has no wrapper for this method, so it needs a client with raw_request (RpcPool).
+    """
+    result = await client.raw_request("getRecentPrioritizationFees", [[str(account) for account in accounts]])
+    return [entry["prioritizationFee"] for entry in result]
+
+def priority_fee_lamports(instructions: Sequence[Instruction], default_units: int) -> int:
+    """Priority fee charged for the limit and price set by these instructions.
+
+    `default_units` stands in for the limit when none is set.
+    """
+    units, price = default_units, 0
+    for ix in instructions:
+        if ix.program_id != COMPUTE_BUDGET_PROGRAM_ID:
+            continue
+        if ix.data[0] == SET_COMPUTE_UNIT_LIMIT:
+            units = int.from_bytes(ix.data[1:5], 'little')
+        elif ix.data[0] == SET_COMPUTE_UNIT_PRICE:
+            price = int.from_bytes(ix.data[1:9], 'little')
+    return -(-units * price // 1_000_000)
+
+class ComputeBudget:
+    """Tight compute-unit limits measured by simulation, plus a capped percentile priority fee.
+
+    Compute units are simulated once per transaction shape (e.g. payout batch size) and
+    cached; the fee is refreshed every FEE_MAX_AGE seconds per set of writable accounts.
+    """
+
+    def __init__(self, client: AsyncClient, fee_percentile: int = PRIORITY_FEE_PERCENTILE,
+                 fee_cap: int = PRIORITY_FEE_CAP, margin: float = COMPUTE_UNIT_MARGIN):
+        self.client = client
+        self.fee_percentile = fee_percentile
+        self.fee_cap = fee_cap
+        self.margin = margin
+        self.simulations = 0
+        self._units: Dict[Hashable, Optional[int]] = {}
+        self._prices: Dict[Tuple[Pubkey, ...], Tuple[int, float]] = {}
+        self._units_lock = asyncio.Lock()
+        self._price_lock = asyncio.Lock()
+
+    async def unit_price(self, writable_accounts: List[Pubkey]) -> int:
+        """Priority fee in micro-lamports per CU, capped at `fee_cap`"""
+        key = tuple(writable_accounts)
+        async with self._price_lock:
+            cached = self._prices.get(key)
+            if cached and time.monotonic() - cached[1] <= FEE_MAX_AGE:
+                return cached[0]
+
+            try:
+                fees = await get_recent_prioritization_fees(self.client, writable_accounts)
+                price = min(percentile(fees, self.fee_percentile), self.fee_cap)
+            except Exception as e:
+                print(f"⚠️  Could not fetch recent priority fees, sending without one: {e}")
+                price = 0
+
+            self._prices[key] = (price, time.monotonic())
+            return price
+
+    async def unit_limit(self, shape: Hashable, build: TxBuilder, price: int) -> Optional[int]:
+        """Compute units used by this transaction shape plus margin, or None if simulation failed"""
+        async with self._units_lock:
+            if shape in self._units:
+                return self._units[shape]
+
+            # Simulate with the budget instructions included so their own cost is counted
+            tx = build([set_compute_unit_limit(MAX_COMPUTE_UNITS), set_compute_unit_price(price)])
+            units = None
+            try:
+                if isinstance(tx, SoldersTransaction):
+                    tx = VersionedTransaction.from_legacy(tx)
+                response = await self.client.simulate_transaction(tx)
+                self.simulations += 1
+                if response.value.err is None and response.value.units_consumed:
+                    units = min(MAX_COMPUTE_UNITS, int(response.value.units_consumed * self.margin))
+                else:
+                    print(f"⚠️  Simulation of {shape} failed ({response.value.err}), using default CU limit")
+            except Exception as e:
+                print(f"⚠️  Simulation of {shape} failed ({e}), using default CU limit")
+
+            self._units[shape] = units
+            return units
+
+    async def instructions(self, shape: Hashable, build: TxBuilder,
+                           writable_accounts: List[Pubkey]) -> List[Instruction]:
+        """ComputeBudget instructions to prepend to a transaction of this shape"""
+        price = await self.unit_price(writable_accounts)
+        units = await self.unit_limit(shape, build, price)
+
+        instructions = []
+        if units is not None:
+            instructions.append(set_compute_unit_limit(units))
+        instructions.append(set_compute_unit_price(price))
+        return instructions
@@ -0,0 +1,241 @@
+import os
+import time
+import asyncio
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.core import RPCException
+from typing import Any, List, Optional
+
+# Comma-separated endpoints; SOLANA_RPC_URL alone still works
+SOLANA_RPC_URLS = [u.strip() for u in os.getenv("SOLANA_RPC_URLS", "").split(",") if u.strip()]
+RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+
+# Per-endpoint request budget (most providers limit requests per second per key)
+RPC_RATE_LIMIT = float(os.getenv("RPC_RATE_LIMIT", "50"))
+RPC_BURST = int(os.getenv("RPC_BURST", "100"))
+
+# A hedged read starts a second endpoint if the first has not answered in this long
+RPC_HEDGE_DELAY = float(os.getenv("RPC_HEDGE_DELAY", "0.3"))
+
+# An endpoint that errors or rate-limits us is skipped for this long (doubling while it keeps failing)
+COOLDOWN_BASE = 1.0
+COOLDOWN_MAX = 60.0
+
+# Timeout of raw JSON-RPC requests (methods solana-py has no wrapper for)
+RAW_REQUEST_TIMEOUT = 10.0
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+
+# Idempotent reads that are raced across two endpoints. Blockhashes, block heights and
+# signature statuses are left out: mixing answers from nodes at different heights could
+# make a landed transaction look expired (and get re-sent), or hand out a blockhash the
+# node it is sent to has not seen yet
+HEDGED_METHODS = {
+    "get_program_accounts",
+    "get_multiple_accounts",
+    "get_account_info",
+    "get_slot",
+}
+
+# Endpoint every call in the current task goes to, inside RpcPool.pinned()
+_pinned: ContextVar[Optional["Endpoint"]] = ContextVar("rpc_pool_pinned", default=None)
+
+def ws_url() -> str:
+    """SOLANA_WS_URL, or the websocket endpoint of the first RPC endpoint"""
+    rpc_url = (SOLANA_RPC_URLS or [RPC_URL])[0]
+    return os.getenv("SOLANA_WS_URL") or rpc_url.replace("https://", "wss://").replace("http://", "ws://")
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; acquire() waits for a token"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class Endpoint:
+    def __init__(self, url: str, rate: float, burst: int):
+        self.url = url
+        self.client = AsyncClient(url)
+        self.bucket = TokenBucket(rate, burst)
+        self.latency = 0.0  # EWMA seconds, 0 until the first sample
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.http = None  # httpx client for raw_request, created on first use
+
+    @property
+    def cooling(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def record_latency(self, seconds: float):
+        self.latency = seconds if self.latency == 0 else (
+            LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * self.latency)
+
+    def record_success(self, seconds: float):
+        self.record_latency(seconds)
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        self.cooldown_until = time.monotonic() + min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (self.failures - 1))
+
+    async def raw_request(self, method: str, params: list) -> Any:
+        """JSON-RPC call for a method solana-py has no wrapper for; returns its `result`"""
+        if self.http is None:
+            import httpx
+            self.http = httpx.AsyncClient(timeout=RAW_REQUEST_TIMEOUT)
+
+        response = await self.http.post(self.url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+        response.raise_for_status()
+        body = response.json()
+        if "error" in body:
+            raise RPCException(body["error"])
+        return body["result"]
+
+    async def close(self):
+        await self.client.close()
+        if self.http is not None:
+            await self.http.aclose()
+
+class RpcPool:
+    """Drop-in stand-in for AsyncClient spread over several RPC endpoints.
+
+    Calls go to the endpoint with the lowest latency that has tokens left and is not
+    cooling down after an error. Reads in HEDGED_METHODS are also started on the next
+    best endpoint if the first is slow, and the first answer wins. Other calls fail
+    over to the next endpoint on transport errors; an RPCException (the node rejected
+    the request) is raised as is. Inside pinned(), calls all go to one endpoint.
+    Methods solana-py has no wrapper for go through raw_request(), routed the same way.
+    """
+
+    def __init__(self, urls: List[str], rate: float = RPC_RATE_LIMIT, burst: int = RPC_BURST,
+                 hedge_delay: float = RPC_HEDGE_DELAY):
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint")
+        self.endpoints = [Endpoint(url, rate, burst) for url in dict.fromkeys(urls)]
+        self.hedge_delay = hedge_delay
+        self.hedges = 0
+
+    def ranked(self) -> List[Endpoint]:
+        """Endpoints best first: not cooling down, tokens available, then lowest latency"""
+        return sorted(self.endpoints, key=lambda e: (e.cooling, e.bucket.available() < 1, e.latency))
+
+    @contextmanager
+    def pinned(self):
+        """Send every call made in this block to one endpoint, without hedging or failover.
+
+        For reads that are only meaningful together, like a block height and the
+        signature statuses judged against it.
+        """
+        token = _pinned.set(self.ranked()[0])
+        try:
+            yield
+        finally:
+            _pinned.reset(token)
+
+    async def raw_request(self, method: str, params: list) -> Any:
+        return await self._routed("raw_request", (method, params), {})
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.endpoints[0].client, name)
+        if not inspect.iscoroutinefunction(attr):
+            # Plain attributes (e.g. the HTTP provider) come from the current best endpoint
+            return getattr(self.ranked()[0].client, name)
+
+        if name in HEDGED_METHODS and len(self.endpoints) > 1:
+            async def hedged(*args, **kwargs):
+                return await self._hedged(name, args, kwargs)
+            return hedged
+
+        async def routed(*args, **kwargs):
+            return await self._routed(name, args, kwargs)
+        return routed
+
+    async def _call(self, endpoint: Endpoint, name: str, args, kwargs) -> Any:
+        await endpoint.bucket.acquire()
+        started = time.monotonic()
+        try:
+            target = endpoint if name == "raw_request" else endpoint.client
+            result = await getattr(target, name)(*args, **kwargs)
+        except RPCException:
+            endpoint.record_success(time.monotonic() - started)  # The endpoint itself is healthy
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedge race: it was at least this slow, which keeps it from ranking first
+            endpoint.record_latency(time.monotonic() - started)
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return result
+
+    async def _routed(self, name: str, args, kwargs) -> Any:
+        pinned = _pinned.get()
+        if pinned in self.endpoints:
+            return await self._call(pinned, name, args, kwargs)
+
+        error: Optional[Exception] = None
+        for endpoint in self.ranked():
+            try:
+                return await self._call(endpoint, name, args, kwargs)
+            except RPCException:
+                raise
+            except Exception as e:
+                error = e
+        raise error
+
+    async def _hedged(self, name: str, args, kwargs) -> Any:
+        if _pinned.get() in self.endpoints:
+            return await self._routed(name, args, kwargs)
+
+        candidates = self.ranked()
+        tasks: List[asyncio.Task] = []
+        error: Optional[Exception] = None
+
+        try:
+            while candidates or tasks:
+                if candidates and (not tasks or len(tasks) < 2):
+                    tasks.append(asyncio.create_task(self._call(candidates.pop(0), name, args, kwargs)))
+                    if len(tasks) > 1:
+                        self.hedges += 1
+
+                # Wait for an answer, or for the hedge delay to start the next endpoint
+                timeout = self.hedge_delay if candidates and len(tasks) < 2 else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    if isinstance(error, RPCException):
+                        raise error
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        await asyncio.gather(*(endpoint.close() for endpoint in self.endpoints))
@@ -0,0 +1,187 @@
+import os
+import asyncio
+from solders.signature import Signature
+from solders.commitment_config import CommitmentLevel
+from solders.rpc.config import RpcSignatureSubscribeConfig
+from solders.rpc.requests import SignatureSubscribe, SignatureUnsubscribe
+from solders.rpc.responses import SignatureNotification, SubscriptionError, SubscriptionResult, parse_websocket_message
+from typing import Dict, List, Optional
+from rpc_pool import ws_url
+
+# CONFIRM_WEBSOCKET=1 confirms claims and payouts through one shared signatureSubscribe
+# websocket; signature status polling takes over whenever it is down
+CONFIRM_WEBSOCKET = os.getenv("CONFIRM_WEBSOCKET", "1") == "1"
+
+# Reconnect backoff after the socket drops, doubling up to the max
+WS_RECONNECT_DELAY = 1.0
+WS_RECONNECT_MAX = 30.0
+
+class SignatureSubscriber:
+    """One websocket multiplexing signatureSubscribe for every signature awaiting confirmation.
+
+    subscribe() returns a future that resolves to the transaction error (None if it
+    succeeded) once the signature reaches the commitment. The socket is opened on the
+    first subscribe, and every outstanding signature is resubscribed after a reconnect;
+    `connected` is clear while it is down.
+    """
+
+    def __init__(self, url: Optional[str] = None, commitment: CommitmentLevel = CommitmentLevel.Confirmed):
+        self.url = url or ws_url()
+        self.config = RpcSignatureSubscribeConfig(commitment=commitment)
+        self.futures: Dict[Signature, asyncio.Future] = {}
+        self.connected = asyncio.Event()
+        self.notifications = 0
+        self.reconnects = 0
+        self._unsent: List[Signature] = []
+        self._unsubscribe: List[int] = []
+        self._outbox = asyncio.Event()
+        self._request_id = 0
+        self._requests: Dict[int, Signature] = {}       # request id -> signature, until acknowledged
+        self._subscriptions: Dict[int, Signature] = {}  # subscription id -> signature
+        self._ids: Dict[Signature, int] = {}            # signature -> subscription id
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, signature: Signature) -> asyncio.Future:
+        future = self.futures.get(signature)
+        if future is None:
+            future = self.futures[signature] = asyncio.get_running_loop().create_future()
+            self._unsent.append(signature)
+            self._outbox.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return future
+
+    def forget(self, signature: Signature):
+        """Stop watching a signature that was settled some other way"""
+        future = self.futures.pop(signature, None)
+        if future is not None:
+            future.cancel()
+        subscription = self._ids.pop(signature, None)
+        if subscription is not None:
+            del self._subscriptions[subscription]
+            self._unsubscribe.append(subscription)
+            self._outbox.set()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    async def _run(self):
+        from websockets.legacy.client import connect
+
+        delay = WS_RECONNECT_DELAY
+        while True:
+            # Stay disconnected until there is something to watch
+            while not self.futures:
+                self._outbox.clear()
+                await self._outbox.wait()
+
+            try:
+                async with connect(self.url, max_size=None) as websocket:
+                    # Subscription ids are per connection, so start over with everything outstanding
+                    self._requests.clear()
+                    self._subscriptions.clear()
+                    self._ids.clear()
+                    self._unsubscribe.clear()
+                    self._unsent = list(self.futures)
+                    self._outbox.set()
+                    self.connected.set()
+                    delay = WS_RECONNECT_DELAY
+
+                    tasks = [asyncio.create_task(self._send(websocket)), asyncio.create_task(self._receive(websocket))]
+                    try:
+                        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        # Fall back to polling now, not after the close handshake
+                        self.connected.clear()
+                        for task in tasks:
+                            task.cancel()
+                    for task in done:
+                        task.result()
+                    raise ConnectionError("websocket closed")
+            except Exception as e:
+                if self.futures:
+                    print(f"⚠️  Signature websocket dropped ({e}), confirming by polling; reconnecting in {delay:.0f}s")
+            finally:
+                self.connected.clear()
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WS_RECONNECT_MAX)
+
+    async def _send(self, websocket):
+        while True:
+            await self._outbox.wait()
+            self._outbox.clear()
+            unsubscribe, self._unsubscribe = self._unsubscribe, []
+            unsent, self._unsent = self._unsent, []
+
+            for subscription in unsubscribe:
+                await websocket.send(SignatureUnsubscribe(subscription, self._next_id()).to_json())
+            for signature in unsent:
+                if signature not in self.futures:
+                    continue  # Forgotten before it was sent
+                request_id = self._next_id()
+                self._requests[request_id] = signature
+                await websocket.send(SignatureSubscribe(signature, self.config, request_id).to_json())
+
+    async def _receive(self, websocket):
+        async for raw in websocket:
+            try:
+                messages = parse_websocket_message(raw)
+            except Exception:
+                continue  # Unsubscribe acknowledgements and anything else we did not ask about
+            for message in messages:
+                self._handle(message)
+
+    def _handle(self, message):
+        if isinstance(message, SignatureNotification):
+            # The node drops a signature subscription after its one notification
+            signature = self._subscriptions.pop(message.subscription, None)
+            if signature is None:
+                return
+            del self._ids[signature]
+            future = self.futures.pop(signature, None)
+            if future is not None and not future.done():
+                error = message.result.value.err
+                self.notifications += 1
+                future.set_result(None if error is None else str(error))
+
+        elif isinstance(message, SubscriptionResult):
+            signature = self._requests.pop(message.id, None)
+            if signature is None:
+                return
+            if signature in self.futures:
+                self._subscriptions[message.result] = signature
+                self._ids[signature] = message.result
+            else:
+                self._unsubscribe.append(message.result)  # Forgotten while subscribing
+                self._outbox.set()
+
+        elif isinstance(message, SubscriptionError):
+            # The node refused this subscription; status polling still confirms the signature
+            self._requests.pop(message.id, None)
+
+_shared: Optional[SignatureSubscriber] = None
+
+def shared() -> Optional[SignatureSubscriber]:
+    """The process-wide subscriber every ConfirmationTracker uses (None with CONFIRM_WEBSOCKET=0)"""
+    global _shared
+    if CONFIRM_WEBSOCKET and _shared is None:
+        _shared = SignatureSubscriber()
+    return _shared
+
+async def close_shared():
+    global _shared
+    if _shared is not None:
+        await _shared.close()
+        _shared = None
@@ -0,0 +1,49 @@
+import os
+import time
+from typing import List, Optional, Tuple
+
+# Imported first by automain.py, so this is as close to interpreter start as Python code gets
+_started = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+def process_age() -> Optional[float]:
+    """Seconds since the OS started this process (Linux only), covering interpreter startup"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+_interpreter_sec = process_age()
+
+def mark(label: str):
+    """Record that a startup phase finished (only the first time, so daemon re-runs don't grow the list)"""
+    if any(existing == label for existing, _ in _marks):
+        return
+    _marks.append((label, time.perf_counter()))
+
+def report() -> dict:
+    """Per-phase durations in milliseconds since the previous mark"""
+    phases = {}
+    previous = _started
+    for label, at in _marks:
+        phases[label] = round((at - previous) * 1000, 1)
+        previous = at
+
+    return {
+        'interpreter_ms': round(_interpreter_sec * 1000, 1) if _interpreter_sec is not None else None,
+        'phases_ms': phases,
+        'total_ms': round((previous - _started) * 1000, 1),
+    }
+
+def print_report():
+    timing = report()
+    print("⏱️  Startup timing:")
+    if timing['interpreter_ms'] is not None:
+        print(f"   {'interpreter':<24} {timing['interpreter_ms']:>8.1f} ms")
+    for label, ms in timing['phases_ms'].items():
+        print(f"   {label:<24} {ms:>8.1f} ms")
+    print(f"   {'total':<24} {timing['total_ms']:>8.1f} ms")
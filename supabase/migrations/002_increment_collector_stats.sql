@@ -0,0 +1,48 @@
+/*
+  Atomic statistics updates for the fee collector.
+
+  Replaces the client-side SELECT + UPDATE of the singleton fee_collector_stats row
+  with a single RPC call, so each update is one round trip and concurrent runs
+  can no longer overwrite each other's increments.
+
+  ## Functions Created
+
+  ### increment_collector_stats(p_sol_paid, p_executions)
+  - Adds `p_sol_paid` to `total_sol_paid` and `p_executions` to `successful_executions`
+  - Sets `last_payout_amount` when `p_executions` > 0
+  - Always bumps `last_payout_at` and `updated_at` (timer continuity)
+  - Creates the singleton row if it does not exist yet
+  - Returns the updated row
+
+  ## Security
+  - Runs with the caller's rights; existing RLS policies on fee_collector_stats apply
+  - Anon can EXECUTE (backend script)
+*/
+
+CREATE OR REPLACE FUNCTION increment_collector_stats(
+  p_sol_paid numeric DEFAULT 0,
+  p_executions integer DEFAULT 0
+)
+RETURNS fee_collector_stats
+LANGUAGE sql
+AS $$
+  INSERT INTO fee_collector_stats AS s (
+    id, total_sol_paid, successful_executions, last_payout_amount, last_payout_at
+  )
+  VALUES (
+    '00000000-0000-0000-0000-000000000001',
+    p_sol_paid,
+    p_executions,
+    CASE WHEN p_executions > 0 THEN p_sol_paid ELSE 0 END,
+    now()
+  )
+  ON CONFLICT (id) DO UPDATE SET
+    total_sol_paid = s.total_sol_paid + EXCLUDED.total_sol_paid,
+    successful_executions = s.successful_executions + EXCLUDED.successful_executions,
+    last_payout_amount = CASE WHEN p_executions > 0 THEN p_sol_paid ELSE s.last_payout_amount END,
+    last_payout_at = now(),
+    updated_at = now()
+  RETURNING *;
+$$;
+
+GRANT EXECUTE ON FUNCTION increment_collector_stats(numeric, integer) TO anon;
@@ -0,0 +1,130 @@
+/*
+  Bounded collector_logs retention with batch pruning.
+
+  The cleanup_logs_trigger from init.sql sorted and deleted the whole log after every
+  insert statement. It is replaced by a prune function that runs on a schedule (and
+  at the end of each collector run), so a log insert is a plain index append again.
+
+  ## Tables Created
+
+  ### collector_log_retention
+  Singleton retention settings:
+  - `keep_rows` (integer) - Newest log rows kept (default 5000; the old trigger kept 200)
+  - `keep_age` (interval) - Rows older than this are removed too; NULL keeps them by count only
+  - `updated_at` (timestamptz) - Last settings change
+
+  Change retention with e.g.
+    UPDATE collector_log_retention SET keep_rows = 20000, keep_age = interval '30 days';
+
+  ## Functions Created
+
+  ### prune_collector_logs()
+  - Deletes every row older than the `keep_rows`-th newest id, and rows older than `keep_age`
+  - Takes no arguments: retention is whatever collector_log_retention says, so the anon
+    key can trigger a prune but cannot choose to delete more
+  - Finds the cutoff with a backward scan of the primary key, so cost grows with the
+    rows deleted, not with the table
+  - Returns the number of rows deleted
+
+  ## Scheduling
+  - With pg_cron installed, `prune-collector-logs` runs every 10 minutes
+  - The collector also calls prune_collector_logs() once per run, so retention holds
+    without pg_cron
+
+  ## Security
+  - prune_collector_logs is SECURITY DEFINER: anon has no DELETE policy on collector_logs
+  - Anyone can SELECT the retention settings; only the owner can change them
+*/
+
+-- =============================================================================
+-- Drop the per-insert cleanup
+-- =============================================================================
+
+DROP TRIGGER IF EXISTS cleanup_logs_trigger ON collector_logs;
+DROP FUNCTION IF EXISTS cleanup_old_logs();
+
+-- =============================================================================
+-- TABLE: collector_log_retention
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS collector_log_retention (
+  id integer PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  keep_rows integer DEFAULT 5000 NOT NULL CHECK (keep_rows > 0),
+  keep_age interval,
+  updated_at timestamptz DEFAULT now() NOT NULL
+);
+
+INSERT INTO collector_log_retention (id) VALUES (1) ON CONFLICT DO NOTHING;
+
+ALTER TABLE collector_log_retention ENABLE ROW LEVEL SECURITY;
+
+-- Policy: Anyone can read retention settings
+CREATE POLICY "Anyone can read log retention"
+  ON collector_log_retention
+  FOR SELECT
+  USING (true);
+
+-- =============================================================================
+-- FUNCTION: prune_collector_logs
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION prune_collector_logs()
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_keep_rows integer;
+  v_keep_age interval;
+  v_cutoff_id bigint;
+  v_deleted integer := 0;
+  v_count integer;
+BEGIN
+  SELECT r.keep_rows, r.keep_age
+  INTO v_keep_rows, v_keep_age
+  FROM collector_log_retention r
+  WHERE r.id = 1;
+
+  v_keep_rows := COALESCE(v_keep_rows, 5000);
+
+  -- Oldest id still kept: a backward primary key scan of keep_rows entries
+  SELECT id INTO v_cutoff_id
+  FROM collector_logs
+  ORDER BY id DESC
+  OFFSET v_keep_rows - 1
+  LIMIT 1;
+
+  IF v_cutoff_id IS NOT NULL THEN
+    DELETE FROM collector_logs WHERE id < v_cutoff_id;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_deleted := v_deleted + v_count;
+  END IF;
+
+  IF v_keep_age IS NOT NULL THEN
+    DELETE FROM collector_logs WHERE timestamp < now() - v_keep_age;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_deleted := v_deleted + v_count;
+  END IF;
+
+  RETURN v_deleted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION prune_collector_logs() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION prune_collector_logs() TO anon;
+
+-- Apply the new retention right away (the old trigger kept 200 rows, so this deletes nothing)
+SELECT prune_collector_logs();
+
+-- =============================================================================
+-- Schedule (pg_cron, when available)
+-- =============================================================================
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('prune-collector-logs', '*/10 * * * *', 'SELECT prune_collector_logs()');
+  END IF;
+END;
+$$;
@@ -0,0 +1,89 @@
+/*
+  Queryable payout history.
+
+  Holder payouts used to be one collector_logs row each, with the recipient inside
+  `metadata`, and were soon pruned with the rest of the log. Confirmed payouts are now
+  written to their own table, in bulk once per distribution run.
+
+  ## Tables Created
+
+  ### payouts
+  One row per confirmed holder payout:
+  - `id` (bigserial, primary key) - Auto-incrementing ID
+  - `wallet` (text) - Creator wallet that paid
+  - `run_id` (bigint) - Distribution run id from the collector's local journal
+  - `recipient` (text) - Holder wallet paid
+  - `lamports` (bigint) - Amount paid
+  - `tx_signature` (text) - Transaction that paid it
+  - `paid_at` (timestamptz) - When the run recorded it
+
+  (tx_signature, recipient) is unique, so re-sending a run's history after a retry
+  or a resumed run never duplicates rows. run_id is only unique per journal file (it
+  restarts at 1 on a new host or journal path), so it is indexed but not part of the key.
+
+  ### recipient_payout_totals (view)
+  Per-holder totals: payout count, lamports paid, first and last payout time.
+
+  ## Indexes
+  - payouts (recipient, paid_at DESC) - A holder's history, newest first
+  - payouts (tx_signature, recipient) - The unique constraint
+  - payouts (wallet, run_id) - Everything paid in one run
+  - payouts (paid_at DESC) - Recent payouts for dashboards
+
+  ## Security
+  - RLS enabled
+  - Anyone can SELECT (public payout history)
+  - Anon can INSERT (backend script)
+  - No UPDATE or DELETE via policies
+*/
+
+-- =============================================================================
+-- TABLE: payouts
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS payouts (
+  id bigserial PRIMARY KEY,
+  wallet text NOT NULL,
+  run_id bigint NOT NULL,
+  recipient text NOT NULL,
+  lamports bigint NOT NULL CHECK (lamports > 0),
+  tx_signature text NOT NULL,
+  paid_at timestamptz DEFAULT now() NOT NULL,
+  CONSTRAINT payouts_tx_recipient_key UNIQUE (tx_signature, recipient)
+);
+
+CREATE INDEX IF NOT EXISTS payouts_wallet_run_idx ON payouts (wallet, run_id);
+
+CREATE INDEX IF NOT EXISTS payouts_recipient_idx ON payouts (recipient, paid_at DESC);
+CREATE INDEX IF NOT EXISTS payouts_paid_at_idx ON payouts (paid_at DESC);
+
+-- Enable Row Level Security
+ALTER TABLE payouts ENABLE ROW LEVEL SECURITY;
+
+-- Policy: Anyone can read payouts (public payout history)
+CREATE POLICY "Anyone can read payouts"
+  ON payouts
+  FOR SELECT
+  USING (true);
+
+-- Policy: Anon can insert payouts (backend script)
+CREATE POLICY "Anon can insert payouts"
+  ON payouts
+  FOR INSERT
+  TO anon
+  WITH CHECK (true);
+
+-- =============================================================================
+-- VIEW: recipient_payout_totals
+-- =============================================================================
+
+CREATE OR REPLACE VIEW recipient_payout_totals
+WITH (security_invoker = true) AS
+SELECT
+  recipient,
+  COUNT(*) AS payouts,
+  SUM(lamports) AS total_lamports,
+  MIN(paid_at) AS first_paid_at,
+  MAX(paid_at) AS last_paid_at
+FROM payouts
+GROUP BY recipient;
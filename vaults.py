@@ -0,0 +1,201 @@
+import asyncio
+from solders.pubkey import Pubkey
+from solders.keypair import Keypair
+from solders.hash import Hash
+from solders.instruction import Instruction, AccountMeta
+from solders.transaction import Transaction as SoldersTransaction
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from priority_fees import ComputeBudget
+
+PUMP_AMM_PROGRAM_ID = Pubkey.from_string("pAMMBay6oceH9fJKBRHGP5D4bD4sWpmSwMn52FMfXEA")
+WSOL_MINT = Pubkey.from_string("So11111111111111111111111111111111111111112")
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+ATA_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+SYSTEM_PROGRAM_ID = Pubkey.from_string("11111111111111111111111111111111")
+
+AMM_EVENT_AUTHORITY = Pubkey.find_program_address([b"__event_authority"], PUMP_AMM_PROGRAM_ID)[0]
+
+# collect_coin_creator_fee discriminator: [160,57,89,42,181,139,43,66]
+COLLECT_COIN_CREATOR_FEE = bytes([160, 57, 89, 42, 181, 139, 43, 66])
+
+# SPL token layouts: token account amount is a u64 at offset 64, mint decimals a u8 at offset 44
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+MINT_DECIMALS_OFFSET = 44
+
+# getMultipleAccounts accepts at most 100 keys per request
+MULTIPLE_ACCOUNTS_LIMIT = 100
+
+def derive_ata(owner: Pubkey, mint: Pubkey) -> Pubkey:
+    return Pubkey.find_program_address([bytes(owner), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ATA_PROGRAM_ID)[0]
+
+def derive_vault_authority(creator_pubkey: Pubkey) -> Pubkey:
+    # Derive the vault authority using YOUR wallet (coin_creator)
+    return Pubkey.find_program_address([b"creator_vault", bytes(creator_pubkey)], PUMP_AMM_PROGRAM_ID)[0]
+
+def derive_coin_vault(creator_pubkey: Pubkey, mint: Pubkey = WSOL_MINT) -> tuple[Pubkey, Pubkey]:
+    """Derive the creator vault authority and its AMM fee vault (ATA) for a quote mint"""
+    vault_authority = derive_vault_authority(creator_pubkey)
+
+    # The AMM vault is a single ATA per quote mint for all your tokens
+    return vault_authority, derive_ata(vault_authority, mint)
+
+@dataclass
+class CreatorVault:
+    """One creator's AMM fee vault for one quote mint, with every PDA derived up front"""
+    creator: Keypair
+    mint: Pubkey
+    vault_authority: Pubkey
+    coin_vault: Pubkey
+    creator_ata: Pubkey
+
+    # Filled in by scan_vaults()
+    vault_exists: bool = False
+    amount: int = 0
+    decimals: int = 9
+    ata_exists: bool = False
+
+    @property
+    def creator_pubkey(self) -> Pubkey:
+        return self.creator.pubkey()
+
+    @property
+    def ui_amount(self) -> float:
+        return self.amount / (10 ** self.decimals)
+
+    @property
+    def is_wsol(self) -> bool:
+        return self.mint == WSOL_MINT
+
+def wsol_by_creator(vaults: List[CreatorVault]) -> Dict[Pubkey, float]:
+    """SOL held in the WSOL vaults of each creator"""
+    totals: Dict[Pubkey, float] = {}
+    for vault in vaults:
+        if vault.is_wsol:
+            totals[vault.creator_pubkey] = totals.get(vault.creator_pubkey, 0.0) + vault.ui_amount
+    return totals
+
+def plan_vaults(creators: List[Keypair], mints: List[Pubkey]) -> List[CreatorVault]:
+    """Derive vault authority, coin vault and creator ATA once for every creator and quote mint"""
+    vaults = []
+    for creator in creators:
+        vault_authority = derive_vault_authority(creator.pubkey())
+        for mint in mints:
+            vaults.append(CreatorVault(
+                creator=creator,
+                mint=mint,
+                vault_authority=vault_authority,
+                coin_vault=derive_ata(vault_authority, mint),
+                creator_ata=derive_ata(creator.pubkey(), mint),
+            ))
+    return vaults
+
+async def get_accounts(client: AsyncClient, pubkeys: List[Pubkey]) -> Dict[Pubkey, Optional[bytes]]:
+    """Fetch raw account data for many accounts in as few getMultipleAccounts calls as possible"""
+    unique = list(dict.fromkeys(pubkeys))
+    chunks = [unique[i:i + MULTIPLE_ACCOUNTS_LIMIT] for i in range(0, len(unique), MULTIPLE_ACCOUNTS_LIMIT)]
+    responses = await asyncio.gather(*(client.get_multiple_accounts(chunk, encoding="base64") for chunk in chunks))
+
+    accounts = {}
+    for chunk, response in zip(chunks, responses):
+        for pubkey, account in zip(chunk, response.value):
+            accounts[pubkey] = bytes(account.data) if account is not None else None
+    return accounts
+
+async def scan_vaults(client: AsyncClient, vaults: List[CreatorVault]):
+    """Load vault balances, creator ATA existence and mint decimals in one batched fetch"""
+    keys = [v.coin_vault for v in vaults] + [v.creator_ata for v in vaults] + [v.mint for v in vaults]
+    accounts = await get_accounts(client, keys)
+
+    for vault in vaults:
+        vault_data = accounts.get(vault.coin_vault)
+        mint_data = accounts.get(vault.mint)
+
+        vault.vault_exists = vault_data is not None
+        vault.ata_exists = accounts.get(vault.creator_ata) is not None
+
+        if vault_data:
+            vault.amount = int.from_bytes(
+                vault_data[TOKEN_ACCOUNT_AMOUNT_OFFSET:TOKEN_ACCOUNT_AMOUNT_OFFSET + 8], 'little')
+        if mint_data:
+            vault.decimals = mint_data[MINT_DECIMALS_OFFSET]
+
+def build_claim_instructions(vault: CreatorVault) -> List[Instruction]:
+    """Instructions that move a vault's fees to the creator (and unwrap WSOL to SOL)"""
+    creator_pubkey = vault.creator_pubkey
+    instructions = []
+
+    # Create the creator's token account if it does not exist yet
+    if not vault.ata_exists:
+        instructions.append(Instruction(
+            ATA_PROGRAM_ID,
+            bytes([]),  # Empty data for create instruction
+            [
+                AccountMeta(creator_pubkey, is_signer=True, is_writable=True),
+                AccountMeta(vault.creator_ata, is_signer=False, is_writable=True),
+                AccountMeta(creator_pubkey, is_signer=False, is_writable=False),
+                AccountMeta(vault.mint, is_signer=False, is_writable=False),
+                AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+                AccountMeta(TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
+            ]
+        ))
+
+    instructions.append(Instruction(PUMP_AMM_PROGRAM_ID, COLLECT_COIN_CREATOR_FEE, [
+        AccountMeta(vault.mint, is_signer=False, is_writable=False),
+        AccountMeta(TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
+        AccountMeta(creator_pubkey, is_signer=False, is_writable=False),
+        AccountMeta(vault.vault_authority, is_signer=False, is_writable=False),
+        AccountMeta(vault.coin_vault, is_signer=False, is_writable=True),
+        AccountMeta(vault.creator_ata, is_signer=False, is_writable=True),
+        AccountMeta(AMM_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+        AccountMeta(PUMP_AMM_PROGRAM_ID, is_signer=False, is_writable=False),
+    ]))
+
+    # Close the WSOL account to unwrap WSOL back to SOL
+    if vault.is_wsol:
+        instructions.append(Instruction(
+            TOKEN_PROGRAM_ID,
+            bytes([9]),  # CloseAccount instruction discriminator
+            [
+                AccountMeta(vault.creator_ata, is_signer=False, is_writable=True),
+                AccountMeta(creator_pubkey, is_signer=False, is_writable=True),
+                AccountMeta(creator_pubkey, is_signer=True, is_writable=False),
+            ]
+        ))
+
+    return instructions
+
+def build_claim_tx(vault: CreatorVault, blockhash: Hash, compute_budget: Sequence[Instruction] = ()) -> SoldersTransaction:
+    return SoldersTransaction.new_signed_with_payer(
+        list(compute_budget) + build_claim_instructions(vault),
+        vault.creator_pubkey,
+        [vault.creator],
+        blockhash
+    )
+
+async def claim_compute_budget(vault: CreatorVault, blockhash: Hash,
+                               budget: Optional[ComputeBudget]) -> List[Instruction]:
+    """ComputeBudget instructions for a vault's claim, or none without a budget"""
+    if not budget:
+        return []
+    # Claim cost differs with the optional ATA create and WSOL close instructions
+    return await budget.instructions(
+        ("claim", vault.ata_exists, vault.is_wsol),
+        lambda prefix: build_claim_tx(vault, blockhash, prefix),
+        [vault.coin_vault, vault.creator_ata]
+    )
+
+async def send_claim(client: AsyncClient, vault: CreatorVault, blockhash: Hash,
+                     budget: Optional[ComputeBudget] = None, skip_preflight: bool = False,
+                     compute_budget: Optional[Sequence[Instruction]] = None) -> str:
+    """Sign and send the claim transaction for one vault, returning its signature.
+
+    Pass `compute_budget` to reuse instructions already computed from `budget`.
+    """
+    if compute_budget is None:
+        compute_budget = await claim_compute_budget(vault, blockhash, budget)
+    tx = build_claim_tx(vault, blockhash, compute_budget)
+    result = await client.send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=skip_preflight))
+    return str(result.value)
@@ -1,163 +1,127 @@
 import os
-from solders.pubkey import Pubkey
-from solana.rpc.async_api import AsyncClient
+import sys
+import json
+import time
+import argparse
+from contextlib import nullcontext, redirect_stdout
 from dotenv import load_dotenv
 import asyncio
-import base58
-from typing import List, Tuple
-import struct
 
 load_dotenv()
 
+from holder_index import load_holders
+from holder_analytics import EXPORTERS, rank_title, summarize, top_holders
+from rpc_pool import RpcPool, SOLANA_RPC_URLS
+
 # Configuration
-ATOMID_PROGRAM_ID = Pubkey.from_string("rnc2fycemiEgj4YbMSuwKFpdV6nkJonojCXib3j2by6")
 RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
 
-# Rank titles
-RANK_TITLES = {
-    0: "Initiate",
-    1: "Believer",
-    2: "Devotee",
-    3: "Guardian",
-    4: "Keeper",
-    5: "Oracle",
-    6: "Architect",
-    7: "Sage",
-    8: "Ascended",
-    9: "Eternal"
-}
-
-async def get_atomid_holders(client: AsyncClient) -> List[Tuple[Pubkey, int, int]]:
-    """Get all AtomID holders with their burned amounts and ranks"""
-    print(f"\n🔍 Fetching AtomID holders from program {ATOMID_PROGRAM_ID}...")
-    print()
-
-    try:
-        from solana.rpc.commitment import Confirmed
-
-        # Fetch all AtomID accounts from the program
-        response = await client.get_program_accounts(
-            ATOMID_PROGRAM_ID,
-            commitment=Confirmed,
-            encoding="base64",
-            filters=[
-                # Account discriminator for AtomID accounts (8 bytes)
-                # Data size filter: 8 (discriminator) + 32 (owner) + 8 (total_burned) + 1 (rank) + 204 (metadata) + 8 (created_at) + 8 (updated_at) + 1 (bump)
-                270
-            ]
-        )
-
-        if not response or not hasattr(response, 'value'):
-            print(f"❌ Invalid response from RPC")
-            return []
-
-        print(f"📊 Processing {len(response.value)} AtomID accounts...")
-        print()
-        holders = []
-
-        for account in response.value:
-            try:
-                # Decode base64 data
-                data = base58.b58decode(account.account.data[0]) if isinstance(account.account.data, list) else account.account.data
-
-                # AtomID account layout:
-                # - 8 bytes: discriminator
-                # - 32 bytes: owner (Pubkey)
-                # - 8 bytes: total_burned (u64)
-                # - 1 byte: rank (u8)
-                # - 204 bytes: metadata (String with length prefix)
-                # - 8 bytes: created_at_slot (u64)
-                # - 8 bytes: updated_at_slot (u64)
-                # - 1 byte: bump
-
-                if len(data) >= 49:  # At least discriminator + owner + total_burned + rank
-                    owner_bytes = data[8:40]  # Skip 8-byte discriminator
-                    total_burned_bytes = data[40:48]
-                    rank = data[48]
-
-                    owner = Pubkey(owner_bytes)
-                    total_burned = struct.unpack('<Q', total_burned_bytes)[0]
-
-                    holders.append((owner, total_burned, rank))
-            except Exception as e:
-                print(f"⚠️  Error parsing account: {e}")
-                continue
-
-        return holders
-
-    except Exception as e:
-        print(f"❌ Error fetching AtomID holders: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+def parse_args():
+    parser = argparse.ArgumentParser(description="AtomID holder leaderboard, statistics and exports")
+    parser.add_argument("--top", type=int, default=None, help="print only the N largest burners (default: all)")
+    parser.add_argument("--summary-only", action="store_true", help="skip the leaderboard table")
+    parser.add_argument("--csv", metavar="PATH", help="export the full leaderboard as CSV")
+    parser.add_argument("--jsonl", metavar="PATH", help="export the full leaderboard as JSON Lines")
+    parser.add_argument("--parquet", metavar="PATH", help="export the full leaderboard as Parquet (needs pyarrow)")
+    parser.add_argument("--json-summary", action="store_true",
+                        help="print the summary as one JSON object instead of the tables")
+    return parser.parse_args()
 
 async def main():
-    print("=" * 80)
-    print("AtomID Holders Viewer")
-    print("=" * 80)
-    print()
+    args = parse_args()
+    exports = {fmt: getattr(args, fmt) for fmt in EXPORTERS if getattr(args, fmt)}
+    quiet = args.json_summary
 
-    client = AsyncClient(RPC_URL)
+    if not quiet:
+        print("=" * 80)
+        print("AtomID Holders Viewer")
+        print("=" * 80)
+        print()
 
-    try:
-        holders = await get_atomid_holders(client)
+    client = RpcPool(SOLANA_RPC_URLS or [RPC_URL])
 
-        if not holders:
-            print("❌ No AtomID holders found")
+    try:
+        # Fetch progress goes to stderr under --json-summary, so stdout is only the JSON
+        with redirect_stdout(sys.stderr) if quiet else nullcontext():
+            holders = await load_holders(client)
+
+        if len(holders) == 0:
+            if quiet:
+                print(json.dumps(summarize(holders)))
+            else:
+                print("❌ No AtomID holders found")
             return
 
-        # Sort by burned amount (descending)
-        holders_sorted = sorted(holders, key=lambda x: x[1], reverse=True)
+        started = time.perf_counter()
+        summary = summarize(holders)
+        order = top_holders(holders, args.top)
+        analytics_ms = (time.perf_counter() - started) * 1000
+
+        if quiet:
+            print(json.dumps(summary))
+        else:
+            print_summary(summary, analytics_ms)
+            if not args.summary_only:
+                print_leaderboard(holders, order, summary)
+            print_rank_distribution(summary)
+
+        # Exports always cover every holder, whatever --top limits the table to
+        full_order = order if args.top is None else top_holders(holders)
+        for fmt, path in exports.items():
+            started = time.perf_counter()
+            rows = EXPORTERS[fmt](holders, path, full_order)
+            print(f"📄 Exported {rows:,} holders to {path} in {time.perf_counter() - started:.2f}s",
+                  file=sys.stderr if quiet else sys.stdout)
 
-        # Calculate totals
-        total_burned = sum(burned for _, burned, _ in holders)
-        total_holders = len(holders)
+    except Exception as e:
+        # Keep stdout parseable under --json-summary
+        print(f"❌ Error: {e}", file=sys.stderr if quiet else sys.stdout)
+        import traceback
+        traceback.print_exc()
 
-        print("=" * 80)
-        print(f"📊 SUMMARY")
-        print("=" * 80)
-        print(f"Total AtomID Holders: {total_holders}")
-        print(f"Total ATOM Burned: {total_burned / 1e6:,.2f}")
-        print(f"Average Burned per Holder: {(total_burned / total_holders) / 1e6:,.2f}")
-        print()
+    finally:
+        await client.close()
 
-        print("=" * 80)
-        print(f"{'#':<5} {'WALLET':<45} {'RANK':<12} {'BURNED':<20} {'%':<8}")
-        print("=" * 80)
+def print_summary(summary: dict, analytics_ms: float):
+    print("=" * 80)
+    print(f"📊 SUMMARY")
+    print("=" * 80)
+    print(f"Total AtomID Holders: {summary['holders']}")
+    print(f"Total ATOM Burned: {summary['total_burned_atom']:,.2f}")
+    print(f"Average Burned per Holder: {summary['average_burned_atom']:,.2f}")
+    for pct, value in summary['percentiles_atom'].items():
+        print(f"P{pct} Burned: {value:,.2f}")
+    print(f"(computed in {analytics_ms:.1f} ms)")
+    print()
 
-        for idx, (owner, burned, rank) in enumerate(holders_sorted, 1):
-            rank_title = RANK_TITLES.get(rank, f"Rank {rank}")
-            burned_amount = burned / 1e6
-            percentage = (burned / total_burned) * 100
+def print_leaderboard(holders, order, summary: dict):
+    total_burned = summary['total_burned_atom'] * 1e6
 
-            print(f"{idx:<5} {str(owner):<45} {rank_title:<12} {burned_amount:>15,.2f} ATOM {percentage:>6.2f}%")
+    print("=" * 80)
+    print(f"{'#':<5} {'WALLET':<45} {'RANK':<12} {'BURNED':<20} {'%':<8}")
+    print("=" * 80)
 
-        print("=" * 80)
-        print()
+    for idx, i in enumerate(order, 1):
+        owner, burned, rank = holders[i]
+        burned_amount = burned / 1e6
+        percentage = (burned / total_burned) * 100
 
-        # Rank distribution
-        rank_distribution = {}
-        for _, _, rank in holders:
-            rank_title = RANK_TITLES.get(rank, f"Rank {rank}")
-            rank_distribution[rank_title] = rank_distribution.get(rank_title, 0) + 1
+        print(f"{idx:<5} {str(owner):<45} {rank_title(rank):<12} {burned_amount:>15,.2f} ATOM {percentage:>6.2f}%")
 
-        print("=" * 80)
-        print("📈 RANK DISTRIBUTION")
-        print("=" * 80)
-        for rank_title in sorted(rank_distribution.keys(), key=lambda x: list(RANK_TITLES.values()).index(x) if x in RANK_TITLES.values() else 999):
-            count = rank_distribution[rank_title]
-            pct = (count / total_holders) * 100
-            bar = "█" * int(pct / 2)
-            print(f"{rank_title:<12} {count:>4} holders ({pct:>5.1f}%) {bar}")
-        print("=" * 80)
+    print("=" * 80)
+    print()
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+def print_rank_distribution(summary: dict):
+    total_holders = summary['holders']
 
-    finally:
-        await client.close()
+    print("=" * 80)
+    print("📈 RANK DISTRIBUTION")
+    print("=" * 80)
+    for title, count in summary['ranks'].items():
+        pct = (count / total_holders) * 100
+        bar = "█" * int(pct / 2)
+        print(f"{title:<12} {count:>4} holders ({pct:>5.1f}%) {bar}")
+    print("=" * 80)
 
 if __name__ == "__main__":
     asyncio.run(main())